@@ -6,9 +6,19 @@ if [ -z "${IDLESITE_ENV+x}" ]; then
 	export PATH="$PATH:$PATHCOMPONENT"
 	unset PATHCOMPONENT
 
-	CMDS="$(find commands/ -type f -executable -printf "%P ")"
-	for CMD in $CMDS; do
-		eval complete $($CMD --completion) $CMD
-	done
-	complete -W "$CMDS" -E
+	# completion for every command, regenerated in one process
+	# whenever the game's code or strings change since it was cached
+	KEY="# $(stat -c '%n %y' game/*.py i18n/*.json commands/* | cksum)"
+	CACHE=saves/.completion.bash
+	if [ "$(head -n 1 $CACHE 2>/dev/null)" != "$KEY" ]; then
+		{ echo "$KEY"; python3 game --completion-all; } > $CACHE.$$ \
+			&& mv $CACHE.$$ $CACHE || rm -f $CACHE.$$
+	fi
+	source $CACHE
+	unset KEY CACHE
+
+	# opt-in: keep the game loaded in the background so commands start fast
+	if [ -n "${IDLESITE_DAEMON+x}" ]; then
+		python3 game --daemon
+	fi
 fi
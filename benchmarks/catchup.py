@@ -0,0 +1,29 @@
+"""SaveSlot.update() catching up on many days at once,
+in a few typical situations. Run through run.py."""
+from statistics import median
+from time import perf_counter
+from synthetic import make_slot
+
+# keyword arguments to make_slot()
+SCENARIOS = {
+    'quiet': {},
+    'ads': {'ads': 5, 'proportion': '0.25'},
+    'busy': {'ads': 20, 'channels': 5, 'transactions': 10,
+             'proportion': '0.25'},
+}
+DAYS = (1_000, 100_000, 1_000_000)
+
+def run(runs: int, days: tuple[int, ...] = DAYS) -> dict[str, float]:
+    """Median seconds taken by update(), keyed by scenario and days."""
+    from game import slot
+    results = {}
+    for name, options in SCENARIOS.items():
+        for count in days:
+            times = []
+            for seed in range(runs):
+                data = make_slot(slot, elapsed=count, seed=seed, **options)
+                start = perf_counter()
+                data.update()
+                times.append(perf_counter() - start)
+            results['update/%s/%d' % (name, count)] = median(times)
+    return results
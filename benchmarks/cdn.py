@@ -0,0 +1,26 @@
+"""CDNSetup.boost() and cost() at every whole-degree coordinate.
+Run through run.py."""
+from statistics import median
+from time import perf_counter
+
+def run(runs: int) -> dict[str, float]:
+    """Seconds taken to load the grids, then the median of ``runs``
+    sweeps of boost() and of cost() over the whole grid."""
+    from game import slot
+    start = perf_counter()
+    # loaded on import by older trees, on first use by newer ones
+    getattr(slot, 'BRIGHTNESS')
+    getattr(slot, 'POPULATION')
+    results = {'grids/load': perf_counter() - start}
+    data = slot.SaveSlot()
+    servers = [slot.CDNSetup(lat, long)
+               for lat in range(-89, 91) for long in range(-180, 180)]
+    for method in ('boost', 'cost'):
+        times = []
+        for _ in range(runs):
+            start = perf_counter()
+            for server in servers:
+                getattr(server, method)(data)
+            times.append(perf_counter() - start)
+        results['cdn/%s' % method] = median(times)
+    return results
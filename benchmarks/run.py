@@ -0,0 +1,144 @@
+"""Run the benchmarks, optionally comparing against an earlier run.
+
+Run from the repository root:
+
+    python3 benchmarks/run.py [--tree PATH] [--only SUITE,...] [--quick]
+                              [--output FILE] [--compare FILE]
+
+Everything runs offline in a scratch copy of the tree. Suites:
+
+    update     SaveSlot.update() over 1k, 100k and 1M days (catchup.py)
+    storage    load_slot() and save_slot() of large slots (storage.py)
+    cdn        CDNSetup.boost() and cost() over the grid (cdn.py)
+    serialize  (un)serializing a slot of 1M days (serialize.py)
+    startup    cold start of every command (startup.py)
+
+To keep a baseline and check a later change against it:
+
+    python3 benchmarks/run.py --output baseline.json
+    python3 benchmarks/run.py --compare baseline.json
+
+--compare exits with status 1 if anything got slower by more than
+--tolerance (and by more than --noise seconds, to ignore jitter in
+measurements that take next to no time).
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import subprocess
+import catchup
+import cdn
+import serialize
+import startup
+import storage
+
+SUITES = ('update', 'storage', 'cdn', 'serialize', 'startup')
+
+def run_suites(tree: str, suites: list[str], runs: int,
+               quick: bool) -> dict[str, float]:
+    results = {}
+    if 'startup' in suites:
+        for command, times in startup.measure(tree, runs).items():
+            for kind, seconds in times.items():
+                results['startup/%s/%s' % (command, kind)] = seconds
+    path = startup.scratch_tree(tree)
+    cwd = os.getcwd()
+    try:
+        # the game finds its data files relative to the working directory
+        os.chdir(path)
+        sys.path.insert(0, path)
+        if 'update' in suites:
+            results.update(catchup.run(runs, catchup.DAYS[:2] if quick
+                                       else catchup.DAYS))
+        if 'storage' in suites:
+            results.update(storage.run(runs, storage.HISTORY[:1] if quick
+                                       else storage.HISTORY))
+        if 'cdn' in suites:
+            results.update(cdn.run(runs))
+        if 'serialize' in suites:
+            results.update(serialize.run(runs, serialize.DAYS // 10 if quick
+                                         else serialize.DAYS))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path)
+    return results
+
+def commit(tree: str) -> str:
+    """The commit checked out in ``tree``, if it is a git checkout."""
+    proc = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=tree,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          text=True)
+    return proc.stdout.strip()
+
+def compare(results: dict[str, float], baseline: dict[str, float],
+            tolerance: float, noise: float) -> list[str]:
+    """Print both sets of results side by side.
+    Returns the keys of those that regressed."""
+    regressed = []
+    print('%-32s %12s %12s %8s' % ('benchmark', 'baseline', 'now', 'ratio'))
+    for key, value in results.items():
+        if key not in baseline:
+            print('%-32s %12s %12.4f' % (key, '-', value))
+            continue
+        old = baseline[key]
+        ratio = value / old if old else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance and (
+                key.endswith('/bytes') or value - old > noise):
+            regressed.append(key)
+            flag = '  REGRESSED'
+        print('%-32s %12.4f %12.4f %8.2f%s' % (key, old, value, ratio, flag))
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--tree', default='.',
+                        help='game tree to measure (default: this one)')
+    parser.add_argument('--only', default=','.join(SUITES),
+                        help='comma-separated suites to run (default: all)')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='runs per measurement; the median is reported')
+    parser.add_argument('--quick', action='store_true',
+                        help='skip the 1M-day sizes')
+    parser.add_argument('--output', metavar='FILE',
+                        help='also write the results to FILE as JSON')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with results written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slowdown ratio above 1 counted as a regression '
+                        '(default: %(default)s)')
+    parser.add_argument('--noise', type=float, default=0.005,
+                        help='slowdowns of fewer seconds than this are '
+                        'never regressions (default: %(default)s)')
+    args = parser.parse_args()
+    suites = args.only.split(',')
+    for suite in suites:
+        if suite not in SUITES:
+            parser.error('unknown suite %r' % suite)
+    tree = os.path.abspath(args.tree)
+
+    results = run_suites(tree, suites, args.runs, args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': commit(tree),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'runs': args.runs,
+                'results': results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.tolerance, args.noise):
+            sys.exit(1)
+    else:
+        print('%-32s %12s' % ('benchmark', 'result'))
+        for key, value in results.items():
+            print('%-32s %12.4f' % (key, value))
+
+if __name__ == '__main__':
+    main()
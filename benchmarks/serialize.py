@@ -0,0 +1,68 @@
+"""Save and load throughput of a slot with a long history of views.
+
+Run from the repository root:
+
+    python3 benchmarks/serialize.py [--tree PATH] [--days N] [--runs N]
+
+--tree measures the serializer of another checkout instead
+(e.g. ``git worktree add /tmp/old HEAD~1``). "legacy load" is loading
+the list of [views, cumulative] pairs that older saves hold.
+Also run by run.py.
+"""
+import sys
+import json
+import argparse
+from statistics import median
+from time import perf_counter
+from synthetic import make_slot
+
+DAYS = 10 ** 6
+
+def timed(function, runs: int) -> float:
+    """Median wall-clock time of ``function()``, in seconds."""
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return median(times)
+
+def run(runs: int, days: int = DAYS) -> dict[str, float]:
+    """Median seconds taken to serialize and unserialize the slot."""
+    from game import slot
+    data = make_slot(slot, history=days, ads=10, channels=10,
+                     transactions=10)
+    raw = json.dumps(data.serialize(data))
+    legacy = json.loads(raw)
+    legacy['views'] = [list(pair) for pair in data.views]
+    legacy = json.dumps(legacy)
+    return {
+        'serialize/save': timed(
+            lambda: json.dumps(data.serialize(data)), runs),
+        'serialize/load': timed(
+            lambda: slot._JL.unserialize(json.loads(raw)), runs),
+        'serialize/legacy load': timed(
+            lambda: slot._JL.unserialize(json.loads(legacy)), runs),
+        'serialize/bytes': len(raw),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--tree', default='.',
+                        help='game tree to measure (default: this one)')
+    parser.add_argument('--days', type=int, default=DAYS,
+                        help='days of views in the slot (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='runs per measurement; the median is reported')
+    args = parser.parse_args()
+    sys.path.insert(0, args.tree)
+    results = run(args.runs, args.days)
+    print('%d days, %.2f MB saved' % (
+        args.days, results.pop('serialize/bytes') / 1e6))
+    print('%-12s %10s %14s' % ('operation', 'seconds', 'days/second'))
+    for name, seconds in results.items():
+        name = name.split('/', 1)[1]
+        print('%-12s %10.3f %14.0f' % (name, seconds, args.days / seconds))
+
+if __name__ == '__main__':
+    main()
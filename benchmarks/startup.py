@@ -0,0 +1,104 @@
+"""Cold start time of every command, in a scratch copy of a game tree.
+
+Run from the repository root:
+
+    python3 benchmarks/startup.py [--tree PATH] [--runs N]
+
+To compare with another revision, check it out somewhere else
+(e.g. ``git worktree add /tmp/old HEAD~1``) and pass it as --tree.
+"""
+import os
+import re
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+from time import perf_counter
+
+# arguments that make each command do something typical without prompting
+ARGS = {
+    'start': [],
+    'hello': [],
+    'game-help': [],
+    'create-site': ['-s', 'scratch', '-I', '-f'],
+    'select-slot': ['bench', '-I'],
+    'check': ['stats'],
+    'buy': ['-q', 'advertisement'],
+    'change': ['ads'],
+    'promo': ['friends'],
+    'cancel': ['transaction', '1'],
+}
+
+def scratch_tree(tree: str) -> str:
+    """Copy the parts of the tree that commands need, with a slot in it."""
+    path = tempfile.mkdtemp(prefix='idlesite-bench-')
+    for name in os.listdir(tree):
+        if name in {'.git', 'saves', 'benchmarks'}:
+            continue
+        src = os.path.join(tree, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(path, name),
+                            ignore=shutil.ignore_patterns('__pycache__'))
+        else:
+            shutil.copy2(src, path)
+    os.mkdir(os.path.join(path, 'saves'))
+    with open(os.path.join(path, 'saves', '.lang'), 'w') as f:
+        f.write('en')
+    subprocess.run([sys.executable, 'game', 'create-site', '-s', 'bench',
+                    '-I', '-f'], cwd=path, check=True)
+    subprocess.run([sys.executable, 'game', 'select-slot', 'bench'],
+                   cwd=path, check=True)
+    return path
+
+def import_time(path: str, command: str) -> float:
+    """Cumulative import time of the command's module, in seconds."""
+    module = 'game.' + command.replace('-', '_')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        cwd=path, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        match = re.match(r'import time:\s*\d+ \|\s*(\d+) \| ' + re.escape(
+            module) + '$', line)
+        if match:
+            return int(match.group(1)) / 1e6
+    raise RuntimeError('no import time for %s' % module)
+
+def run_time(path: str, command: str) -> float:
+    """Wall-clock time to run the command once, in seconds."""
+    start = perf_counter()
+    subprocess.run([sys.executable, 'game', command] + ARGS[command],
+                   cwd=path, stdin=subprocess.DEVNULL,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return perf_counter() - start
+
+def measure(tree: str, runs: int) -> dict[str, dict[str, float]]:
+    path = scratch_tree(tree)
+    try:
+        commands = sorted(name for name in os.listdir(
+            os.path.join(path, 'commands')) if '.' not in name)
+        return {command: {
+            'import': median(import_time(path, command)
+                             for _ in range(runs)),
+            'run': median(run_time(path, command) for _ in range(runs)),
+        } for command in commands if command in ARGS}
+    finally:
+        shutil.rmtree(path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--tree', default='.',
+                        help='game tree to measure (default: this one)')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='runs per command; the median is reported')
+    args = parser.parse_args()
+    results = measure(os.path.abspath(args.tree), args.runs)
+    print('%-12s %10s %10s' % ('command', 'import ms', 'run ms'))
+    for command, times in results.items():
+        print('%-12s %10.1f %10.1f' % (
+            command, times['import'] * 1000, times['run'] * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""load_slot() and save_slot() on slots with long histories.
+Run through run.py, which sets up a scratch tree to save them in."""
+from statistics import median
+from time import perf_counter
+from synthetic import make_slot
+
+HISTORY = (10_000, 1_000_000)
+
+def run(runs: int, history: tuple[int, ...] = HISTORY) -> dict[str, float]:
+    """Median seconds taken to save a slot anew, to load it,
+    and to save it again after a day's worth of changes."""
+    import game
+    from game import slot
+    results = {}
+    for days in history:
+        name = 'bench-%d' % days
+        times = {'save': [], 'load': [], 'save day': []}
+        for seed in range(runs):
+            data = make_slot(slot, history=days, ads=10, transactions=10,
+                             seed=seed)
+            start = perf_counter()
+            game.save_slot(name, data)
+            times['save'].append(perf_counter() - start)
+            start = perf_counter()
+            data = game.load_slot(name)
+            times['load'].append(perf_counter() - start)
+            data.views.append((1, data.views_total + 1))
+            data.last_touch += data.day_length
+            data.money += 1
+            start = perf_counter()
+            game.save_slot(name, data)
+            times['save day'].append(perf_counter() - start)
+        for key, values in times.items():
+            results['%s/%d' % (key, days)] = median(values)
+    return results
@@ -0,0 +1,50 @@
+"""Synthetic save slots for the benchmarks.
+
+Only uses what every revision of game/slot.py has,
+so that benchmarks can be run against older trees too.
+"""
+import random
+from time import time
+from decimal import Decimal
+
+def make_slot(slot, history: int = 0, elapsed: int = 0, ads: int = 0,
+              channels: int = 0, transactions: int = 0,
+              proportion: str = '0', seed: int = 0):
+    """A SaveSlot with ``history`` days of views, last touched ``elapsed``
+    days ago (so that update() has that many days to catch up on), with
+    ``ads`` advertisements and ``channels`` self-promotions running and
+    ``transactions`` advertisements bought but not cleared yet.
+
+    ``slot`` is the game.slot module to make it with.
+    """
+    rng = random.Random(seed)
+    day_length = 1200
+    # half a day of slack, so that the day does not tick over mid-benchmark
+    last_touch = int(time()) - elapsed * day_length - day_length // 2
+    data = slot.SaveSlot(
+        view_rate=rng.randint(1, 1000), money=Decimal(10 ** 12),
+        ad_proportion=Decimal(proportion), day_length=day_length,
+        first_touch=last_touch - history * day_length,
+        last_touch=last_touch,
+        continued=True) # no prompt when passing END during a catch-up
+    rate = cumulative = 0
+    def days():
+        nonlocal rate, cumulative
+        for day in range(history):
+            rate += len(str(cumulative)) # roughly the log10 bonus
+            cumulative += rate
+            yield (rate, cumulative)
+    data.views.extend(days())
+    end = history + elapsed
+    for _ in range(ads):
+        data.boosts.append(slot.Advertisement(
+            history + rng.randint(1, max(elapsed, 1)), rng.randint(1, 10000)))
+    for _ in range(channels):
+        # recent ones, since they grow exponentially with their age
+        data.boosts.append(slot.Channels(
+            rng.randint(1, 100), max(end - rng.randint(0, 5), 0)))
+    for _ in range(transactions):
+        data.transactions_pending.append(slot.Transaction(
+            history + rng.randint(1, max(elapsed, 1)), slot.Advertisement(
+                end + rng.randint(1, 100), rng.randint(1, 100))))
+    return data
@@ -1,11 +1,11 @@
 import sys
 import os
-import re
-import json
 import importlib
-from typing import Optional, Callable
+from typing import Optional
 from .i18n import i18n, pi18n
-from .slot import SaveSlot, _JL
+from .slot import SaveSlot
+from .locking import SlotLock, write_atomic
+from . import completion, journal, profiling
 
 def get_slot(argv: list[str]) -> str:
     open('saves/.current', 'a').close() # create empty if not exists
@@ -26,9 +26,13 @@ def get_slot(argv: list[str]) -> str:
     return slot
 
 
+def list_slots() -> list[str]:
+    # dotfiles are game metadata, not slots
+    return [name for name in os.listdir('saves')
+            if name != 'README.md' and not name.startswith('.')]
+
 def get_current_slot() -> str:
-    slots = [name for name in os.listdir('saves')
-             if name not in {'README.md', '.current', '.lang'}]
+    slots = list_slots()
     slot_count = len(slots)
     if slot_count == 0:
         slot = '1'
@@ -41,44 +45,133 @@ def get_current_slot() -> str:
         print('\n'.join(slots))
         while slot not in slots:
             slot = input(i18n('save-slot-prompt'))
-    with open('saves/.current', 'w') as current:
-        current.write(slot)  # save current slot
+    write_atomic('saves/.current', slot.encode())  # save current slot
     return slot
 
+# slots decoded ahead of time by the daemon, with the slot_key they had
+slot_cache: dict[str, tuple[tuple[int, ...], SaveSlot]] = {}
+
+def slot_key(slot: str) -> tuple[int, ...]:
+    """Something that changes whenever the slot's files do."""
+    key = ()
+    for path in (journal.snapshot_path(slot), journal.journal_path(slot)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            key += (0, 0, 0)
+        else:
+            key += (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    return key
+
+def cache_slot(slot: str):
+    """Decode a slot ahead of time, for load_slot to use if unchanged."""
+    key = slot_key(slot)
+    data = journal.read(slot)
+    if data is not None:
+        slot_cache[slot] = (key, data)
+
 def load_slot(slot: str) -> SaveSlot:
     open('saves/%s' % slot, 'a').close()
-    with open('saves/%s' % slot, 'r') as slotfile:
-        data = slotfile.read()
-    if not data:
+    cached = slot_cache.pop(slot, None)
+    if cached is not None and cached[0] == slot_key(slot):
+        return cached[1]
+    data = journal.read(slot)
+    if data is None:
         pi18n('creating-slot', slot)
         data = SaveSlot()
         save_slot(slot, data)
-    else:
-        data = json.loads(data, object_hook=_JL.unserialize)
     return data
 
 def save_slot(slot: str, data: SaveSlot):
-    with open('saves/%s' % slot, 'w') as slotfile:
-        json.dump(data.serialize(data), slotfile)
+    journal.write(slot, data)
 
-CCallback = Callable[[Optional[str], list[str]], list[str]]
+def catch_up(slot: str, ask: bool = True) -> SaveSlot:
+    """Load a slot and save it caught up to today,
+    locking it as a read-only command would.
+    ``ask`` is passed on to SaveSlot.update()."""
+    with SlotLock(slot, exclusive=False) as lock:
+        data = load_slot(slot)
+        key = slot_key(slot)
+        data.update(ask=ask)
+        if data.dirty:
+            lock.upgrade()
+            if slot_key(slot) == key:
+                save_slot(slot, data)
+    return data
 
-def dynamic_completion(subcmds: list[str], callback: CCallback):
-    if 'COMP_KEY' not in os.environ:
-        # untranslated: should not be encountered by regular users
-        sys.exit('Missing COMP_KEY environment variable')
-    point = int(os.environ['COMP_POINT'])
-    split = '[' + os.environ.get('COMP_WORDBREAKS', ' "\'@><=;|&(:') + ']'
-    words = re.split(split, os.environ['COMP_LINE'][:point])
-    try:
-        subcmd = [word for word in words if word in subcmds][0]
-    except IndexError:
-        subcmd = None
-    if words[-1] == subcmd:
-        subcmd = None
-    opts = callback(subcmd, words)
-    print('\n'.join(opt for opt in opts if opt.startswith(words[-1])))
-    sys.exit(0)
+def no_load_slot(game, argv: list[str]) -> bool:
+    value = getattr(game, 'no_load_slot', False)
+    if callable(value): # only for some arguments
+        return value(argv)
+    return value
 
 def import_game(name: str):
     return importlib.import_module('game.' + name.replace('-', '_'))
+
+def run(argv: list[str], started: Optional[tuple[float, float]] = None):
+    """Run the command named by argv[0], exiting when done.
+    ``started`` is when the process started importing the game
+    (perf_counter() and process_time()), if it did so just for this."""
+    with profiling.session(argv) as profile:
+        _run(argv, profile, started)
+
+def _run(argv: list[str], profile: profiling.Session,
+         started: Optional[tuple[float, float]] = None):
+    command = argv[0]
+    show_completion = False
+    if '--completion' in argv:
+        show_completion = True
+        argv.remove('--completion')
+
+    # the game package too, when run from the command line
+    with profile.phase('import', started):
+        try:
+            game = import_game(command)
+        except ImportError:
+            # untranslated: should not be encountered by regular users
+            raise SystemExit(
+                'game: error: invalid command %r' % command) from None
+    if not (hasattr(game, 'completion') and hasattr(game, 'main')):
+        # untranslated: should not be encountered by regular users
+        sys.exit('game: error: invalid command %r' % command)
+    if show_completion:
+        print(game.completion)
+    elif argv[1:2] == ['complete'] and hasattr(game, 'completion_tree'):
+        # before loading anything, so that pressing Tab stays fast
+        completion.dynamic(game.completion_tree)
+    elif no_load_slot(game, argv):
+        # some commands need to not load save slots initially
+        with profile.phase('main'):
+            status = game.main(argv)
+        sys.exit(status or 0)
+    else:
+        with profile.phase('get_slot'):
+            slot_name = get_slot(argv)
+        profile.slot = slot_name
+        # the time spent waiting for other commands on the slot
+        with profile.phase('lock'):
+            lock = SlotLock(slot_name, not hasattr(game, 'read_only'))
+        with lock:
+            with profile.phase('load'):
+                slot = load_slot(slot_name)
+                key = slot_key(slot_name)
+            days = len(slot.views)
+            with profile.phase('update'):
+                slot.update()
+            profile.days = len(slot.views) - days
+            try:
+                with profile.phase('main'):
+                    status = game.main(argv, slot)
+                sys.exit(status or 0)
+            finally:
+                if lock.exclusive:
+                    with profile.phase('save'):
+                        save_slot(slot_name, slot)
+                elif slot.dirty:
+                    # only caught up: unless another command has saved
+                    # the slot (and so caught up too) in the meantime
+                    with profile.phase('upgrade'):
+                        lock.upgrade()
+                    with profile.phase('save'):
+                        if slot_key(slot_name) == key:
+                            save_slot(slot_name, slot)
@@ -1,8 +1,13 @@
 import sys
 import os
+from time import perf_counter, process_time
+
+# for the import phase of IDLESITE_PROFILE=phases, which would otherwise
+# leave out importing the game package itself
+STARTED = perf_counter(), process_time()
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from game import import_game
+from game import run
 
 # not using argparse here because there's no good way to use
 # argparse.REMAINDER *and* allow --completion and --save-slot
@@ -15,32 +20,10 @@ if len(sys.argv) < 2:
 
 del sys.argv[0]
 
-command = sys.argv[0]
-completion = False
-if '--completion' in sys.argv:
-    completion = True
-    sys.argv.remove('--completion')
-
-try:
-    game = import_game(command)
-except ImportError:
-    # untranslated: should not be encountered by regular users
-    raise SystemExit('game: error: invalid command %r' % command) from None
-else:
-    if not (hasattr(game, 'completion') and hasattr(game, 'main')):
-        # untranslated: should not be encountered by regular users
-        sys.exit('game: error: invalid command %r' % command)
-    if completion:
-        print(game.completion)
-    elif hasattr(game, 'no_load_slot'):
-        # some commands need to not load save slots initially
-        sys.exit(game.main(sys.argv) or 0)
-    else:
-        from game import get_slot, load_slot, save_slot
-        slot_name = get_slot(sys.argv)
-        slot = load_slot(slot_name)
-        slot.update()
-        try:
-            sys.exit(game.main(sys.argv, slot) or 0)
-        finally:
-            save_slot(slot_name, slot)
+if sys.argv[0] == '--daemon':
+    from game.daemon import main
+    sys.exit(main(sys.argv[1:]))
+if sys.argv[0] == '--completion-all':
+    from game.completion import main
+    sys.exit(main())
+run(sys.argv, STARTED)
@@ -1,66 +1,75 @@
 import argparse
+from decimal import Decimal
+from functools import lru_cache
 from typing import Optional
-from . import dynamic_completion
+from . import placement
+from .completion import Node, Option, function_name
 from .slot import Advertisement, Boost, CDNSetup, SaveSlot, Transaction
-from .i18n import i18n
+from .i18n import i18n, pi18n
 
-parser = argparse.ArgumentParser(prog='buy', description=i18n('buy-desc'))
-clear = parser.add_mutually_exclusive_group()
-clear.add_argument('-c', '--clear-after', type=int, default=5, metavar='days',
-                   help=i18n('buy-clear-after-opt'))
-clear.add_argument('-o', '--clear-on', type=int, default=None, metavar='day',
-                   help=i18n('buy-clear-on-opt'))
-parser.add_argument('-q', '--quote', action='store_true',
-                   help=i18n('buy-quote-opt'))
-subparsers = parser.add_subparsers(
-    dest='cmd', required=True, title=i18n('subcommands'))
+# built by get_parser()
+ads_parser: argparse.ArgumentParser
+cdn_parser: argparse.ArgumentParser
 
-ads_parser = subparsers.add_parser(
-    'advertisement', description=i18n('buy-advertisement-desc'))
-expiry = ads_parser.add_mutually_exclusive_group()
-expiry.add_argument('-e', '--expires', type=int, default=7, metavar='days',
-                    help=i18n('buy-expires-opt'))
-expiry.add_argument('-t', '--until', type=int, default=None, metavar='day',
-                    help=i18n('buy-until-opt'))
-power = ads_parser.add_mutually_exclusive_group()
-power.add_argument('-p', '--power', type=int, default=100, metavar='power',
-                   help=i18n('buy-power-opt'))
-power.add_argument('-f', '--fraction', type=float, default=None, metavar='multiplier',
-                   help=i18n('buy-fraction-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    global ads_parser, cdn_parser
+    parser = argparse.ArgumentParser(prog='buy', description=i18n('buy-desc'))
+    clear = parser.add_mutually_exclusive_group()
+    clear.add_argument('-c', '--clear-after', type=int, default=5, metavar='days',
+                       help=i18n('buy-clear-after-opt'))
+    clear.add_argument('-o', '--clear-on', type=int, default=None, metavar='day',
+                       help=i18n('buy-clear-on-opt'))
+    parser.add_argument('-q', '--quote', action='store_true',
+                       help=i18n('buy-quote-opt'))
+    subparsers = parser.add_subparsers(
+        dest='cmd', required=True, title=i18n('subcommands'))
 
-cdn_parser = subparsers.add_parser(
-    'cdn', description=i18n('buy-cdn-desc'))
-cdn_parser.add_argument('lat', type=int, metavar='latitude',
-                        help=i18n('buy-lat-opt'))
-cdn_parser.add_argument('long', type=int, metavar='longitude',
-                        help=i18n('buy-long-opt'))
+    ads_parser = subparsers.add_parser(
+        'advertisement', description=i18n('buy-advertisement-desc'))
+    expiry = ads_parser.add_mutually_exclusive_group()
+    expiry.add_argument('-e', '--expires', type=int, default=7, metavar='days',
+                        help=i18n('buy-expires-opt'))
+    expiry.add_argument('-t', '--until', type=int, default=None, metavar='day',
+                        help=i18n('buy-until-opt'))
+    power = ads_parser.add_mutually_exclusive_group()
+    power.add_argument('-p', '--power', type=int, default=100, metavar='power',
+                       help=i18n('buy-power-opt'))
+    power.add_argument('-f', '--fraction', type=float, default=None, metavar='multiplier',
+                       help=i18n('buy-fraction-opt'))
 
-completion = "-o nosort -C 'buy complete'"
+    cdn_parser = subparsers.add_parser(
+        'cdn', description=i18n('buy-cdn-desc'))
+    cdn_parser.add_argument('lat', type=int, nargs='?', metavar='latitude',
+                            help=i18n('buy-lat-opt'))
+    cdn_parser.add_argument('long', type=int, nargs='?', metavar='longitude',
+                            help=i18n('buy-long-opt'))
+    cdn_parser.add_argument('-b', '--best', type=int, nargs='?', const=10,
+                            default=None, metavar='count',
+                            help=i18n('buy-best-opt'))
+    cdn_parser.add_argument('--by', choices=['ratio', 'boost'], default=None,
+                            help=i18n('buy-by-opt'))
+    cdn_parser.add_argument('--budget', type=Decimal, default=None,
+                            metavar='money', help=i18n('buy-budget-opt'))
+    return parser
 
-def complete_callback(subcmd: Optional[str], words: list[str]) -> list[str]:
-    if subcmd is None:
-        OPTS = '-c --clear-after -o --clear-on -q --quote'.split()
-        if len(words) > 1 and words[-2] in OPTS[:-2]:
-            return []
-        opts = []
-        if not (set(OPTS[:-2]) & set(words[:-1])):
-            opts.extend(OPTS[:-2])
-        if not (set(OPTS[-2:]) & set(words[:-1])):
-            opts.extend(OPTS[-2:])
-        return ['-h', '--help', 'advertisement', 'cdn'] + opts
-    if subcmd == 'advertisement':
-        OPTS = '-e --expires -t --until -p --power -f --fraction'.split()
-        if words[-2] in OPTS:
-            return []
-        opts = []
-        if not (set(OPTS[:4]) & set(words[:-1])):
-            opts.extend(OPTS[:4])
-        if not (set(OPTS[4:]) & set(words[:-1])):
-            opts.extend(OPTS[4:])
-        return opts
-    if subcmd == 'cdn':
-        return []
-    return []
+completion = "-o nosort -F %s" % function_name('buy')
+
+completion_tree = {
+    None: Node(['-h', '--help', 'advertisement', 'cdn'], [
+        Option('-c', '--clear-after', '-o', '--clear-on', values=[]),
+        Option('-q', '--quote'),
+    ]),
+    'advertisement': Node(options=[
+        Option('-e', '--expires', '-t', '--until', values=[]),
+        Option('-p', '--power', '-f', '--fraction', values=[]),
+    ]),
+    'cdn': Node(options=[
+        Option('-b', '--best'),
+        Option('--by', values=['ratio', 'boost']),
+        Option('--budget', values=[]),
+    ]),
+}
 
 def advertisement(cmdargs: argparse.Namespace, slot: SaveSlot) -> Boost:
     if cmdargs.until is not None:
@@ -77,22 +86,42 @@ def advertisement(cmdargs: argparse.Namespace, slot: SaveSlot) -> Boost:
         ads_parser.error(i18n('error-ads-power'))
     return Advertisement(expires=expires, power=power)
 
-def cdn(cmdargs: argparse.Namespace, slot: SaveSlot) -> CDNSetup:
+def cdn(cmdargs: argparse.Namespace, slot: SaveSlot) -> Optional[CDNSetup]:
+    if cmdargs.best is not None:
+        if cmdargs.lat is not None:
+            cdn_parser.error(i18n('error-best-coords'))
+        return best(cmdargs, slot)
+    if cmdargs.lat is None or cmdargs.long is None:
+        cdn_parser.error(i18n('error-no-coords'))
     if not (-90 <= cmdargs.lat <= 90):
         cdn_parser.error(i18n('error-lat-oor'))
     if not (-180 <= cmdargs.long <= 180):
         cdn_parser.error(i18n('error-long-oor'))
     return CDNSetup(cmdargs.lat, cmdargs.long)
 
+def best(cmdargs: argparse.Namespace, slot: SaveSlot) -> None:
+    """Show where to buy a CDN server instead of buying one."""
+    if cmdargs.best < 1:
+        cdn_parser.error(i18n('error-best-oor'))
+    by = cmdargs.by or ('ratio' if cmdargs.budget is None else 'boost')
+    ranked = placement.best(slot, cmdargs.best, by, cmdargs.budget)
+    if not ranked:
+        pi18n('buy-best-none')
+        return
+    digits = len(str(len(ranked)))
+    for i, (server, boost, cost) in enumerate(ranked, 1):
+        lat, long = server.str_coords(*server.coords, '%3d')
+        pi18n('buy-best-line', str(i).zfill(digits), lat, long, boost, cost)
+
 def main(args: list[str], slot: SaveSlot):
-    if 'complete' in args:
-        dynamic_completion(['advertisement', 'cdn'], complete_callback)
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     if cmdargs.clear_on is not None:
         clear = cmdargs.clear_on
     else:
         clear = slot.today + cmdargs.clear_after
     action = globals()[cmdargs.cmd](cmdargs, slot)
+    if action is None: # only asked where to buy
+        return
     trans = Transaction(clear_date=clear, action=action)
     if cmdargs.quote:
         print(trans.description(slot))
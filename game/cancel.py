@@ -1,4 +1,5 @@
 import argparse
+from functools import lru_cache
 from .slot import SaveSlot
 from .i18n import i18n
 
@@ -6,17 +7,20 @@ TYPES = {
     'transaction': 'transactions_pending',
 }
 
-parser = argparse.ArgumentParser(
-    prog='cancel', description=i18n('cancel-desc'))
-parser.add_argument('type', choices=list(TYPES.keys()),
-                    help=i18n('cancel-type-opt'))
-parser.add_argument('indexes', nargs='+', type=int, metavar='index',
-                    help=i18n('cancel-index-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='cancel', description=i18n('cancel-desc'))
+    parser.add_argument('type', choices=list(TYPES.keys()),
+                        help=i18n('cancel-type-opt'))
+    parser.add_argument('indexes', nargs='+', type=int, metavar='index',
+                        help=i18n('cancel-index-opt'))
+    return parser
 
 completion = f"-o nosort -W '-h --help {' '.join(TYPES)}'"
 
 def main(args: list[str], slot: SaveSlot):
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     attr = TYPES[cmdargs.type]
     # slot.<attr> = [<all items not matching indexes>]
     setattr(slot, attr, [
@@ -1,23 +1,32 @@
 import argparse
+from functools import lru_cache
 from decimal import Decimal
 from .slot import SaveSlot
 from .i18n import i18n
 
-parser = argparse.ArgumentParser(prog='set', description=i18n('set-desc'))
-subparsers = parser.add_subparsers(
-    dest='cmd', required=True, title=i18n('subcommands'))
+# built by get_parser()
+ads_parser: argparse.ArgumentParser
+difficulty_parser: argparse.ArgumentParser
 
-ads_parser = subparsers.add_parser(
-    'ads', description=i18n('set-ads-desc'))
-ads_parser.add_argument(
-    'proportion', nargs='?', type=Decimal,
-    help=i18n('set-ads-proportion-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    global ads_parser, difficulty_parser
+    parser = argparse.ArgumentParser(prog='set', description=i18n('set-desc'))
+    subparsers = parser.add_subparsers(
+        dest='cmd', required=True, title=i18n('subcommands'))
 
-difficulty_parser = subparsers.add_parser(
-    'difficulty', description=i18n('set-difficulty-desc'))
-difficulty_parser.add_argument(
-    'multiplier', nargs='?', type=Decimal,
-    help=i18n('set-difficulty-multiplier-opt'))
+    ads_parser = subparsers.add_parser(
+        'ads', description=i18n('set-ads-desc'))
+    ads_parser.add_argument(
+        'proportion', nargs='?', type=Decimal,
+        help=i18n('set-ads-proportion-opt'))
+
+    difficulty_parser = subparsers.add_parser(
+        'difficulty', description=i18n('set-difficulty-desc'))
+    difficulty_parser.add_argument(
+        'multiplier', nargs='?', type=Decimal,
+        help=i18n('set-difficulty-multiplier-opt'))
+    return parser
 
 completion = "-o nosort -W '-h --help ads difficulty'"
 
@@ -38,5 +47,5 @@ def difficulty(cmdargs: argparse.Namespace, slot: SaveSlot):
     slot.difficulty_multiplier = cmdargs.multiplier
 
 def main(args: list[str], slot: SaveSlot):
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     return globals()[cmdargs.cmd](cmdargs, slot)
\ No newline at end of file
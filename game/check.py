@@ -1,108 +1,148 @@
+import io
 import os
+import sys
+import csv
+import json
 import time
+import shutil
 import argparse
-from typing import Optional
-from . import dynamic_completion
-from .slot import Boost, CDNSetup, SaveSlot
+from collections.abc import Iterable, Iterator
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Optional, Union
+from . import catch_up, list_slots, plot
+from .completion import FILES, Node, Option, function_name
+from .slot import Boost, CDNSetup, SaveSlot, Views
 from .i18n import i18n, pi18n
 
 SUBCMDS = [
-    'complete',
     'boosts', 'cdn', 'stats', 'transactions', 'views'
 ]
 
-parser = argparse.ArgumentParser(prog='check', description=i18n('check-desc'))
-subparsers = parser.add_subparsers(
-    dest='cmd', required=True, title=i18n('subcommands'))
-
-views_parser = subparsers.add_parser(
-    'views', description=i18n('check-views-desc'))
-views_parser.add_argument(
-    '-g', '--graph', nargs='?', metavar='days', const=7, type=int,
-    help=i18n('check-graph-opt'))
-views_parser.add_argument(
-    '-o', '--output', metavar='filename',
-    help=i18n('check-output-opt'))
-views_parser.add_argument(
-    '-t', '--table', nargs='?', metavar='days', const=7, type=int, default=1,
-    help=i18n('check-table-opt'))
-views_parser.add_argument('--csv', action='store_true', help=i18n('check-csv-opt'))
-
 STAT_TYPES = [
     'all', 'today', 'views', 'cumulative', 'money', 'boosts', 'pending',
     'cdn', 'friends', 'promos', 'difficulty', 'day', 'ctime', 'mtime'
 ]
-stats_parser = subparsers.add_parser(
-    'stats', description=i18n('check-stats-desc'))
-stats_parser.add_argument('-n', '--stats', choices=STAT_TYPES, nargs='*',
-                          help=i18n('check-stat-opt'))
-
 BOOST_TYPES = ['advertisement', 'friends', 'channels']
-boosts_parser = subparsers.add_parser(
-    'boosts', description=i18n('check-boosts-desc'))
-boosts_parser.add_argument('-t', '--type', choices=BOOST_TYPES,
-                           help=i18n('check-type-opt'))
 
-trans_parser = subparsers.add_parser(
-    'transactions', description=i18n('check-trans-desc'))
+def all_slots_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--all-slots', action='store_true',
+                        help=i18n('check-all-slots-opt'))
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        metavar='workers', help=i18n('check-jobs-opt'))
+
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='check', description=i18n('check-desc'))
+    subparsers = parser.add_subparsers(
+        dest='cmd', required=True, title=i18n('subcommands'))
+
+    views_parser = subparsers.add_parser(
+        'views', description=i18n('check-views-desc'))
+    views_parser.add_argument(
+        '-g', '--graph', nargs='?', metavar='days', const=7, type=int,
+        help=i18n('check-graph-opt'))
+    views_style = views_parser.add_mutually_exclusive_group()
+    views_style.add_argument('--ascii', action='store_true',
+                             help=i18n('check-ascii-opt'))
+    views_style.add_argument('--sparkline', action='store_true',
+                             help=i18n('check-sparkline-opt'))
+    views_parser.add_argument(
+        '-o', '--output', metavar='filename',
+        help=i18n('check-output-opt'))
+    views_parser.add_argument(
+        '-t', '--table', nargs='?', metavar='days', const=7, type=int,
+        default=1, help=i18n('check-table-opt'))
+    views_parser.add_argument('--from', dest='start', type=int, metavar='day',
+                              help=i18n('check-from-opt'))
+    views_parser.add_argument('--to', dest='end', type=int, metavar='day',
+                              help=i18n('check-to-opt'))
+    views_format = views_parser.add_mutually_exclusive_group()
+    views_format.add_argument('--csv', action='store_true',
+                              help=i18n('check-csv-opt'))
+    views_format.add_argument('--json', action='store_true',
+                              help=i18n('check-json-opt'))
+    all_slots_arguments(views_parser)
+
+    stats_parser = subparsers.add_parser(
+        'stats', description=i18n('check-stats-desc'))
+    stats_parser.add_argument('-n', '--stats', choices=STAT_TYPES, nargs='*',
+                              help=i18n('check-stat-opt'))
+    stats_format = stats_parser.add_mutually_exclusive_group()
+    stats_format.add_argument('--csv', action='store_true',
+                              help=i18n('check-stats-csv-opt'))
+    stats_format.add_argument('--json', action='store_true',
+                              help=i18n('check-json-opt'))
+    all_slots_arguments(stats_parser)
+
+    boosts_parser = subparsers.add_parser(
+        'boosts', description=i18n('check-boosts-desc'))
+    boosts_parser.add_argument('-t', '--type', choices=BOOST_TYPES,
+                               help=i18n('check-type-opt'))
+
+    subparsers.add_parser(
+        'transactions', description=i18n('check-trans-desc'))
+
+    subparsers.add_parser(
+        'cdn', description=i18n('check-cdn-desc'))
+    return parser
 
-cdn_parser = subparsers.add_parser(
-    'cdn', description=i18n('check-cdn-desc'))
+completion = "-o nosort -F %s" % function_name('check')
+read_only = True # shares the slot with other read-only commands
 
-completion = "-o nosort -C 'check complete'"
+def no_load_slot(args: list[str]) -> bool:
+    # --all-slots loads every slot itself, in parallel
+    return '--all-slots' in args
 
 TIME_FMT = '%Y-%m-%d %H:%M:%S (UTC)'
+# rows of plot drawn by --ascii
+GRAPH_HEIGHT = 10
+# rows of check views formatted and written out at a time
+WRITE_ROWS = 4096
+# one day of check views --json, as json.dumps() would write it
+JSON_ROW = '{"day": %d, "views": %d, "cumulative": %d}\n'
 
-def complete_callback(subcmd: Optional[str], words: list[str]) -> list[str]:
-    if subcmd is None:
-        return ['-h', '--help'] + SUBCMDS[1:]
-    if subcmd == 'boosts':
-        OPTS = '-t --type'.split()
-        if words[-2] in OPTS:
-            # check boosts -t/--type <complete, may be empty>
-            return BOOST_TYPES
-        if set(OPTS) & set(words[:-1]):
-            return []
-        # check boosts [-t/--type advertisement] <complete>
-        return OPTS
-    if subcmd == 'stats':
-        OPTS = '-n --stats'.split()
-        if set(OPTS) & set(words[:-1]):
-            if 'all' in words[:-1]:
-                return []
-            return [t for t in STAT_TYPES if t not in words[:-1]]
-        return OPTS
-    if subcmd == 'views':
-        OPTS = '-g --graph -o --output -t --table --csv'.split()
-        if words[-2] in OPTS[2:4]:
-            # check views -o/--output <complete>
-            return [] # should autocomplete filenames, but idk how
-        opts = []
-        if not (set(OPTS[:2]) & set(words[:-1])):
-            opts.extend(OPTS[:2])
-        if not (set(OPTS[2:4]) & set(words[:-1])):
-            opts.extend(OPTS[2:4])
-        if not (set(OPTS[4:6]) & set(words[:-1])):
-            opts.extend(OPTS[4:6])
-        if OPTS[-1] not in words[:-1]:
-            opts.append(OPTS[-1])
-        return opts
-    return []
+completion_tree = {
+    None: Node(['-h', '--help'] + SUBCMDS),
+    'boosts': Node(options=[Option('-t', '--type', values=BOOST_TYPES)]),
+    'cdn': Node(),
+    'stats': Node(options=[
+        Option('-n', '--stats', values=STAT_TYPES, many=True, ends='all'),
+        Option('--csv', '--json'),
+        Option('--all-slots'),
+        Option('-j', '--jobs', values=[]),
+    ]),
+    'transactions': Node(),
+    'views': Node(options=[
+        Option('-g', '--graph'), # the number of days is optional
+        Option('--ascii', '--sparkline'),
+        Option('-o', '--output', values=FILES),
+        Option('-t', '--table'),
+        Option('--from', values=[]),
+        Option('--to', values=[]),
+        Option('--csv', '--json'),
+        Option('--all-slots'),
+        Option('-j', '--jobs', values=[]),
+    ]),
+}
 
 def graph(days: int, slot: SaveSlot, outfile: str):
     try:
         import matplotlib.pyplot as plt
     except ImportError:
         raise SystemExit(i18n('check-views-needs-matplotlib')) from None
-    x = list(range(slot.today))[-days:]
-    if slot.views:
-        views, cumulative = zip(*slot.views[-days:])
-    else:
-        views, cumulative = (), ()
+    first = len(slot.views) - days if 0 < days < len(slot.views) else 0
     fig, ax1 = plt.subplots()
     ax2 = ax1.twinx()
-    plot1, = ax1.plot(x, views, 'r-')
-    plot2, = ax2.plot(x, cumulative, 'b-')
+    # no more points than there are pixels across
+    width = round(fig.get_figwidth() * fig.dpi)
+    x, views = plot.minmax(slot.views.daily[first:], width)
+    plot1, = ax1.plot([first + i for i in x], views, 'r-')
+    x, cumulative = plot.minmax(slot.views.cumulative[first:], width)
+    plot2, = ax2.plot([first + i for i in x], cumulative, 'b-')
     ax1.set_xlabel(i18n('check-views-key-day'))
     ax1.set_ylabel(i18n('check-views-key-views'))
     ax1.yaxis.label.set_color(plot1.get_color())
@@ -119,9 +159,65 @@ def graph(days: int, slot: SaveSlot, outfile: str):
     fig.savefig(fname, bbox_inches='tight')
     pi18n('check-views-fig-saved', fname)
 
+def terminal_graph(days: int, slot: SaveSlot, sparkline: bool):
+    """Draw views over time in the terminal, without matplotlib."""
+    first = len(slot.views) - days if 0 < days < len(slot.views) else 0
+    width = shutil.get_terminal_size().columns
+    series = [
+        (i18n('check-views-key-views'), slot.views.daily[first:]),
+        (i18n('check-views-key-cumulative'), slot.views.cumulative[first:]),
+    ]
+    names = max(len(name) for name, _ in series)
+    for name, values in series:
+        if not values:
+            continue
+        if sparkline:
+            print('%-*s' % (names, name),
+                  plot.sparkline(values, width - names - 1))
+            continue
+        print(name)
+        for line in plot.chart(values, width, GRAPH_HEIGHT, first):
+            print(line)
+
+def view_days(cmdargs: argparse.Namespace, slot: SaveSlot) -> range:
+    """The days to list, in the order to list them: from --from to --to
+    if either is given, otherwise the last --table days, newest first."""
+    days = range(len(slot.views))
+    if cmdargs.start is not None or cmdargs.end is not None:
+        return days[cmdargs.start:None if cmdargs.end is None
+                    else cmdargs.end + 1]
+    if cmdargs.table > 0:
+        days = days[-cmdargs.table:]
+    return days[::-1]
+
+def view_rows(days: range, views: Views, first: int = 0,
+              before: int = 0) -> Iterator[tuple[int, int, int]]:
+    """(day, views, cumulative) for each of ``days``, one at a time,
+    without copying any of the history. ``views`` may start on day
+    ``first`` rather than 0, with ``before`` views in total by then."""
+    index = range(days.start - first, days.stop - first, days.step)
+    cumulative = map(views.cumulative.__getitem__, index)
+    if before:
+        cumulative = map(before.__add__, cumulative)
+    return zip(days, map(views.daily.__getitem__, index), cumulative)
+
+def write_rows(template: str, rows: Iterable[tuple]):
+    """Write out each of ``rows`` %-formatted into ``template``,
+    WRITE_ROWS of them at a time."""
+    lines = map(template.__mod__, rows)
+    while chunk := ''.join(islice(lines, WRITE_ROWS)):
+        sys.stdout.write(chunk)
+
 def views(cmdargs: argparse.Namespace, slot: SaveSlot):
-    if cmdargs.graph is not None:
+    if cmdargs.ascii or cmdargs.sparkline:
+        terminal_graph(7 if cmdargs.graph is None else cmdargs.graph,
+                       slot, cmdargs.sparkline)
+    elif cmdargs.graph is not None:
         graph(cmdargs.graph, slot, cmdargs.output)
+    rows = view_rows(view_days(cmdargs, slot), slot.views)
+    if cmdargs.json:
+        write_rows(JSON_ROW, rows)
+        return
     if cmdargs.csv:
         sep = ','
     else:
@@ -134,14 +230,10 @@ def views(cmdargs: argparse.Namespace, slot: SaveSlot):
     print(header)
     if not cmdargs.csv:
         print('-' * (16 + len(header.rsplit(sep, 1)[-1])))
-    for i, (day, (views, cumulative)) in enumerate(
-        reversed(tuple(enumerate(slot.views)))
-    ):
-        if cmdargs.table > 0 and i >= cmdargs.table:
-            break
-        print(day, views, cumulative, sep=sep)
+    write_rows(sep.join(['%d'] * 3) + '\n', rows)
 
-def stats(cmdargs: argparse.Namespace, slot: SaveSlot):
+def stat_values(slot: SaveSlot) -> tuple[dict[str, object], dict[str, object]]:
+    """The data and the configuration shown by check stats."""
     data = {
         'today': slot.today,
         'views': slot.views_today,
@@ -159,6 +251,20 @@ def stats(cmdargs: argparse.Namespace, slot: SaveSlot):
         'ctime': time.strftime(TIME_FMT, time.gmtime(slot.first_touch)),
         'mtime': time.strftime(TIME_FMT, time.gmtime(slot.last_touch))
     }
+    return data, config
+
+def stats(cmdargs: argparse.Namespace, slot: SaveSlot):
+    data, config = stat_values(slot)
+    if cmdargs.json or cmdargs.csv:
+        values = dict(data, **config)
+        names = stat_names(cmdargs)
+        if cmdargs.json:
+            print(json.dumps({name: values[name] for name in names}))
+        else:
+            writer = csv.writer(sys.stdout, lineterminator='\n')
+            writer.writerow(names)
+            writer.writerow([values[name] for name in names])
+        return
     if cmdargs.stats:
         if 'all' in cmdargs.stats:
             for value in data.values():
@@ -214,8 +320,141 @@ def cdn(cmdargs: argparse.Namespace, slot: SaveSlot):
         lat, long = CDNSetup.str_coords(lat, long, '%3d')
         pi18n('check-cdn-line', str(i).zfill(digits), lat, long, boost)
 
-def main(args: list[str], slot: SaveSlot):
-    if 'complete' in args:
-        dynamic_completion(SUBCMDS[1:], complete_callback)
-    cmdargs = parser.parse_args(args[1:])
+def stat_names(cmdargs: argparse.Namespace) -> list[str]:
+    if not cmdargs.stats or 'all' in cmdargs.stats:
+        return STAT_TYPES[1:]
+    return cmdargs.stats
+
+@dataclass
+class ShownDays:
+    """The days of one slot that check views --all-slots lists, as sent
+    back by the process that caught it up: only the views of the span
+    of days listed, from ``first`` on, packed as in saves, so that they
+    are small to send and unpacked one slot at a time."""
+
+    days: range # in the order to list them
+    first: int
+    before: int # cumulative views before the first day
+    packed: Union[str, list[int]] # Views.packed
+
+    @classmethod
+    def of(cls, days: range, views: Views) -> 'ShownDays':
+        first = min(days, default=0)
+        before = views.cumulative[first - 1] if first else 0
+        return cls(days, first, before,
+                   views[first:max(days, default=-1) + 1].packed)
+
+    def rows(self) -> Iterator[tuple[int, int, int]]:
+        return view_rows(self.days, Views(self.packed),
+                         self.first, self.before)
+
+def slot_rows(name: Optional[str], cmdargs: argparse.Namespace,
+              slot: SaveSlot) -> Union[list[list], ShownDays]:
+    """What --all-slots shows of one slot: rows starting with its name
+    for check stats, or the days to list for check views."""
+    if cmdargs.cmd == 'stats':
+        data, config = stat_values(slot)
+        data.update(config)
+        return [[name] + [data[stat] for stat in stat_names(cmdargs)]]
+    return ShownDays.of(view_days(cmdargs, slot), slot.views)
+
+def slot_template(name: str, cmdargs: argparse.Namespace) -> str:
+    """A template for write_rows() of the days of one slot listed by
+    check views --all-slots, starting with its name."""
+    if cmdargs.json:
+        start = '{"slot": %s, ' % json.dumps(name)
+        return start.replace('%', '%%') + JSON_ROW[1:]
+    sep = ',' if cmdargs.csv else '\t'
+    cell = io.StringIO() # quoted as csv.writer would
+    csv.writer(cell, delimiter=sep, lineterminator='').writerow([name])
+    return cell.getvalue().replace('%', '%%') + sep \
+        + sep.join(['%d'] * 3) + '\n'
+
+def summarize(job: tuple[str, argparse.Namespace]) -> tuple[
+        str, Union[list[list], ShownDays], str, Optional[str], bool]:
+    """Catch up one slot and return its rows, anything printed while
+    doing so, what went wrong if anything did, and whether it was
+    skipped for having passed END."""
+    name, cmdargs = job
+    printed = io.StringIO()
+    try:
+        with redirect_stdout(printed):
+            # saved caught up all the same; whether to continue is
+            # asked the next time the slot is used on its own
+            slot = catch_up(name, ask=False)
+            if slot.won:
+                return name, [], printed.getvalue(), None, True
+            rows = slot_rows(name, cmdargs, slot)
+    except (Exception, SystemExit) as exc:
+        # one broken slot should not stop the others from being shown
+        return (name, [], printed.getvalue(),
+                str(exc) or type(exc).__name__, False)
+    return name, rows, printed.getvalue(), None, False
+
+def detach():
+    # nobody is there to answer any prompt left
+    # for slots checked in bulk, so they fail instead of waiting
+    sys.stdin = open(os.devnull)
+
+def all_slots(cmdargs: argparse.Namespace) -> int:
+    if cmdargs.jobs < 1:
+        get_parser().error(i18n('error-jobs-oor'))
+    names = sorted(list_slots())
+    if cmdargs.cmd == 'stats':
+        keys = ['slot'] + stat_names(cmdargs)
+        header = [i18n('check-all-slots-key-slot')] + keys[1:]
+    else:
+        keys = ['slot', 'day', 'views', 'cumulative']
+        header = [i18n('check-all-slots-key-slot'),
+                  i18n('check-views-key-day'),
+                  i18n('check-views-key-views'),
+                  i18n('check-views-key-cumulative')]
+    writer = csv.writer(sys.stdout, delimiter=',' if cmdargs.csv else '\t',
+                        lineterminator='\n')
+    if not cmdargs.json:
+        writer.writerow(header)
+    jobs = [(name, cmdargs) for name in names]
+    workers = min(cmdargs.jobs, len(jobs))
+    failed = 0
+    if workers <= 1:
+        detach()
+        pool = None
+        results = map(summarize, jobs)
+    else:
+        # only now, since it is slow to import for every check
+        import multiprocessing
+        pool = multiprocessing.Pool(workers, initializer=detach)
+        # in order, as soon as each is done, in chunks big enough
+        # that thousands of slots do not mean thousands of round trips
+        results = pool.imap(summarize, jobs,
+                            chunksize=max(1, len(jobs) // (workers * 4)))
+    try:
+        for name, rows, printed, error, won in results:
+            for line in printed.splitlines():
+                print('%s: %s' % (name, line), file=sys.stderr)
+            if won:
+                pi18n('check-all-slots-won', name, file=sys.stderr)
+            if error is not None:
+                failed += 1
+                pi18n('check-all-slots-error', name, error, file=sys.stderr)
+            if isinstance(rows, ShownDays):
+                write_rows(slot_template(name, cmdargs), rows.rows())
+                continue
+            for row in rows:
+                if cmdargs.json:
+                    print(json.dumps(dict(zip(keys, row))))
+                else:
+                    writer.writerow(row)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return 1 if failed else 0
+
+def main(args: list[str], slot: Optional[SaveSlot] = None):
+    cmdargs = get_parser().parse_args(args[1:])
+    if cmdargs.cmd == 'views' \
+            and min(cmdargs.start or 0, cmdargs.end or 0) < 0:
+        get_parser().error(i18n('error-views-day-oor'))
+    if getattr(cmdargs, 'all_slots', False):
+        return all_slots(cmdargs)
     return globals()[cmdargs.cmd](cmdargs, slot)
@@ -0,0 +1,42 @@
+# Hands a command to the daemon started by `python3 game --daemon`,
+# or runs it directly if the daemon is not running.
+# Imports nothing from the game so that it starts as fast as possible.
+import os
+import sys
+import json
+import socket
+import struct
+
+# keep in sync with game/daemon.py
+SOCKET = 'saves/.daemon'
+LENGTH = struct.Struct('!I')
+STATUS = struct.Struct('!i')
+
+def main(argv: list[str]) -> int:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(SOCKET)
+    except OSError:
+        client.close()
+        os.execvp('python3', ['python3', 'game'] + argv)
+    request = json.dumps({
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+    }).encode()
+    with client:
+        socket.send_fds(client, [LENGTH.pack(len(request))], [0, 1, 2])
+        client.sendall(request)
+        status = b''
+        while len(status) < STATUS.size:
+            chunk = client.recv(STATUS.size - len(status))
+            if not chunk: # daemon died
+                return 1
+            status += chunk
+    return STATUS.unpack(status)[0]
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except KeyboardInterrupt: # the daemon interrupts the command too
+        sys.exit(130)
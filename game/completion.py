@@ -0,0 +1,212 @@
+import os
+import re
+import sys
+import glob
+from shlex import quote
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+# Commands with subcommands or options that take values describe what
+# to complete as a tree: {None: Node before any subcommand, subcommand:
+# Node after it}. bash() compiles the trees into shell functions, so that
+# pressing Tab never has to start Python; complete() walks the same trees
+# in Python, for shells that still call `<command> complete`.
+
+# special values of Option.values and entries of Node.words
+FILES = '@files' # file names
+SLOTS = '@slots' # names of save slots, listed when Tab is pressed
+
+class Option:
+    """Interchangeable (or mutually exclusive) spellings of an option."""
+
+    aliases: tuple[str, ...]
+    # what to complete after it: None if it takes no value,
+    # a list of words (empty if anything goes), FILES or SLOTS
+    values: Union[None, list[str], str]
+    # whether any number of values may follow it,
+    # in which case those not yet given are offered
+    many: bool
+    # a value after which nothing else is offered, if many
+    ends: Optional[str]
+
+    def __init__(self, *aliases: str, values=None, many=False, ends=None):
+        self.aliases = aliases
+        self.values = values
+        self.many = many
+        self.ends = ends
+
+@dataclass
+class Node:
+    """What to complete at one level of a command."""
+
+    # always offered (may include SLOTS)
+    words: list[str] = field(default_factory=list)
+    # offered until one of their aliases is given
+    options: list[Option] = field(default_factory=list)
+
+Tree = dict[Optional[str], Node]
+
+def _expand(words: Union[list[str], str], cur: str) -> list[str]:
+    from . import list_slots
+    if words == FILES:
+        return glob.glob(glob.escape(cur) + '*')
+    if words == SLOTS:
+        return list_slots()
+    result = []
+    for word in words:
+        if word == SLOTS:
+            result.extend(list_slots())
+        else:
+            result.append(word)
+    return result
+
+def complete(tree: Tree, words: list[str]) -> list[str]:
+    """What to offer for the last of ``words``, which are the words
+    of the command line up to the cursor, the command name first."""
+    subcmds = [name for name in tree if name is not None]
+    before, cur = words[:-1], words[-1]
+    subcmd = next((word for word in before[1:] if word in subcmds), None)
+    node = tree[subcmd]
+    prev = before[-1] if before else None
+    for option in node.options:
+        if option.many and set(option.aliases) & set(before):
+            if option.ends in before:
+                return []
+            return [value for value in option.values if value not in before]
+        if option.values is not None and prev in option.aliases:
+            return _expand(option.values, cur)
+    offered = _expand(node.words, cur)
+    for option in node.options:
+        if not (set(option.aliases) & set(before)):
+            offered.extend(option.aliases)
+    return offered
+
+def dynamic(tree: Tree):
+    """Print what to complete, as `complete -C` expects, and exit."""
+    if 'COMP_KEY' not in os.environ:
+        # untranslated: should not be encountered by regular users
+        sys.exit('Missing COMP_KEY environment variable')
+    point = int(os.environ['COMP_POINT'])
+    split = '[' + os.environ.get('COMP_WORDBREAKS', ' "\'@><=;|&(:') + ']'
+    words = re.split(split, os.environ['COMP_LINE'][:point])
+    opts = complete(tree, words)
+    print('\n'.join(opt for opt in opts if opt.startswith(words[-1])))
+    sys.exit(0)
+
+# shared by every generated function; they set $offer, which the
+# caller's $cur is completed from, with $before holding the words
+# before the cursor between spaces for matching against
+HELPERS = r'''_idlesite_reply() {
+	COMPREPLY=($(compgen -W "$offer" -- "$cur"))
+}
+_idlesite_slots() {
+	local slot
+	for slot in "$IDLESITE_ENV"/saves/*; do
+		[[ -f $slot && ${slot##*/} != README.md ]] && offer+=" ${slot##*/}"
+	done
+}
+_idlesite_unused() {
+	local value
+	offer=
+	for value in $1; do
+		[[ $before == *" $value "* ]] || offer+=" $value"
+	done
+}
+'''
+
+def function_name(command: str) -> str:
+    return '_idlesite_' + command.replace('-', '_')
+
+def _bash_words(words: list[str]) -> list[str]:
+    lines = []
+    static = [word for word in words if word != SLOTS]
+    if static:
+        lines.append('offer+=%s' % quote(' ' + ' '.join(static)))
+    if SLOTS in words:
+        lines.append('_idlesite_slots')
+    return lines
+
+def _bash_any(var: str, patterns: list[str]) -> str:
+    return ' || '.join('$%s == %s' % (var, pattern) for pattern in patterns)
+
+def _bash_node(node: Node) -> list[str]:
+    lines = []
+    for option in node.options:
+        given = _bash_any('before', ["*%s*" % quote(' %s ' % alias)
+                                     for alias in option.aliases])
+        if option.many:
+            lines.append('if [[ %s ]]; then' % given)
+            if option.ends is not None:
+                lines.append("\t[[ $before == *%s* ]] && COMPREPLY=() && return"
+                             % quote(' %s ' % option.ends))
+            lines.append('\t_idlesite_unused %s; _idlesite_reply; return'
+                         % quote(' '.join(option.values)))
+            lines.append('fi')
+        if option.values is None or option.many:
+            continue
+        after = _bash_any('prev', [quote(alias) for alias in option.aliases])
+        if option.values == FILES:
+            body = 'COMPREPLY=($(compgen -f -- "$cur"))'
+        elif option.values == SLOTS:
+            body = 'offer=; _idlesite_slots; _idlesite_reply'
+        elif not option.values:
+            body = 'COMPREPLY=()'
+        else:
+            body = 'offer=%s; _idlesite_reply' % quote(' '.join(option.values))
+        lines.append('if [[ %s ]]; then %s; return; fi' % (after, body))
+    lines.extend(_bash_words(node.words))
+    for option in node.options:
+        given = _bash_any('before', ["*%s*" % quote(' %s ' % alias)
+                                     for alias in option.aliases])
+        lines.append('[[ %s ]] || offer+=%s' % (
+            given, quote(' ' + ' '.join(option.aliases))))
+    return lines
+
+def bash(command: str, tree: Tree) -> str:
+    """A bash function completing ``command`` as ``tree`` describes,
+    without running anything but bash builtins."""
+    subcmds = [name for name in tree if name is not None]
+    lines = [
+        'local cur=${COMP_WORDS[COMP_CWORD]} '
+        'prev=${COMP_WORDS[COMP_CWORD-1]}',
+        'local before=" ${COMP_WORDS[*]:0:COMP_CWORD} " offer=',
+    ]
+    if subcmds:
+        lines.extend([
+            'local word subcmd=',
+            'for word in "${COMP_WORDS[@]:1:COMP_CWORD-1}"; do',
+            '\tcase $word in',
+            '\t%s) subcmd=$word; break;;' % '|'.join(
+                quote(name) for name in subcmds),
+            '\tesac',
+            'done',
+            'case $subcmd in',
+        ])
+        for name, node in tree.items():
+            lines.append("%s)" % ("''" if name is None else quote(name)))
+            lines.extend('\t' + line for line in _bash_node(node))
+            lines.append('\t;;')
+        lines.append('esac')
+    else:
+        lines.extend(_bash_node(tree[None]))
+    lines.append('_idlesite_reply')
+    return '%s() {\n%s\n}\n' % (
+        function_name(command), ''.join('\t%s\n' % line for line in lines)[:-1])
+
+def main() -> int:
+    """Print a bash script setting up completion for every command,
+    with their functions if they have trees."""
+    from . import import_game
+    commands = sorted(name for name in os.listdir('commands')
+                      if '.' not in name)
+    print(HELPERS, end='')
+    specs = []
+    for command in commands:
+        game = import_game(command)
+        if hasattr(game, 'completion_tree'):
+            print(bash(command, game.completion_tree), end='')
+        specs.append('complete %s %s' % (game.completion, quote(command)))
+    print('\n'.join(specs))
+    # the command names themselves, on an empty line
+    print('complete -W %s -E' % quote(' '.join(commands)))
+    return 0
@@ -1,36 +1,52 @@
 import argparse
+from functools import lru_cache
 from decimal import Decimal
 import os
 from . import save_slot
+from .locking import SlotLock
+from .completion import SLOTS, Node, Option, function_name
 from .slot import SaveSlot
 from .i18n import i18n, pi18n
 
-parser = argparse.ArgumentParser(
-    prog='create-site', description=i18n('create-site-desc'))
-parser.add_argument(
-    '-a', '--ad-proportion', type=Decimal, default=Decimal(),
-    help=i18n('create-site-ad-proportion-opt'))
-parser.add_argument(
-    '-d', '--difficulty', type=Decimal, default=Decimal('1'),
-    help=i18n('create-site-difficulty-opt'))
-parser.add_argument(
-    '-t', '--day-length', type=int, default=20 * 60,
-    help=i18n('create-site-day-length-opt'))
-parser.add_argument(
-    '-s', '--save-slot', default=None, dest='slot',
-    help=i18n('create-site-save-slot-opt'))
-parser.add_argument(
-    '-f', '--force-overwrite', action='store_true', dest='force',
-    help=i18n('create-site-force-overwrite-opt'))
-parser.add_argument(
-    '-I', '--non-interactive', action='store_false', dest='interactive',
-    help=i18n('create-site-non-interactive-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='create-site', description=i18n('create-site-desc'))
+    parser.add_argument(
+        '-a', '--ad-proportion', type=Decimal, default=Decimal(),
+        help=i18n('create-site-ad-proportion-opt'))
+    parser.add_argument(
+        '-d', '--difficulty', type=Decimal, default=Decimal('1'),
+        help=i18n('create-site-difficulty-opt'))
+    parser.add_argument(
+        '-t', '--day-length', type=int, default=20 * 60,
+        help=i18n('create-site-day-length-opt'))
+    parser.add_argument(
+        '-s', '--save-slot', default=None, dest='slot',
+        help=i18n('create-site-save-slot-opt'))
+    parser.add_argument(
+        '-f', '--force-overwrite', action='store_true', dest='force',
+        help=i18n('create-site-force-overwrite-opt'))
+    parser.add_argument(
+        '-I', '--non-interactive', action='store_false', dest='interactive',
+        help=i18n('create-site-non-interactive-opt'))
+    return parser
 
-completion = "-o nosort -W '-a --ad-proportion -d --difficulty " \
-    "-t --day-length -s --save-slot -f --force-overwrite -I --non-interactive'"
+completion_tree = {
+    None: Node(options=[
+        Option('-a', '--ad-proportion', values=[]),
+        Option('-d', '--difficulty', values=[]),
+        Option('-t', '--day-length', values=[]),
+        Option('-s', '--save-slot', values=SLOTS),
+        Option('-f', '--force-overwrite'),
+        Option('-I', '--non-interactive'),
+    ]),
+}
+completion = "-o nosort -F %s" % function_name('create-site')
 no_load_slot = True
 
 def main(args: list[str], slot: None = None) -> int:
+    parser = get_parser()
     cmdargs = parser.parse_args(args[1:])
     if not (0 <= cmdargs.ad_proportion <= 1):
         parser.error(i18n('error-proportion-oor'))
@@ -57,7 +73,8 @@ def main(args: list[str], slot: None = None) -> int:
     data = SaveSlot(ad_proportion=cmdargs.ad_proportion,
                     difficulty_multiplier=cmdargs.difficulty,
                     day_length=cmdargs.day_length)
-    save_slot(slot, data)
+    with SlotLock(slot, exclusive=True):
+        save_slot(slot, data)
     if cmdargs.interactive:
         pi18n('create-site-site-created', slot,
             str(data.difficulty_multiplier), data.day_length)
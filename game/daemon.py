@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import select
+import signal
+import socket
+import struct
+import traceback
+from . import cache_slot, import_game, run, slot_key
+from .slot import GRIDS, grid, sums
+
+# keep in sync with game/client.py
+SOCKET = 'saves/.daemon'
+# request: length of JSON {argv, cwd, env}, sent with fds 0-2 attached;
+# response: the command's exit status
+LENGTH = struct.Struct('!I')
+STATUS = struct.Struct('!i')
+
+def preload() -> dict[str, tuple[int, ...]]:
+    """Load every command, the grids, and the current slot.
+    Returns the slot_key of all slots, for refresh() to compare against.
+    """
+    for name in os.listdir('commands'):
+        if '.' not in name:
+            import_game(name).get_parser()
+    for name in GRIDS:
+        grid(name)
+    sums('POPULATION')
+    seen = {}
+    for name in os.listdir('saves'):
+        if name != 'README.md' and not name.startswith('.'):
+            seen[name] = slot_key(name)
+    open('saves/.current', 'a').close()
+    with open('saves/.current', 'r') as current:
+        slot = current.read().strip()
+    if slot in seen:
+        cache_slot(slot)
+    return seen
+
+def refresh(seen: dict[str, tuple[int, ...]]):
+    """Decode the slots that changed since they were last seen."""
+    for name in os.listdir('saves'):
+        if name == 'README.md' or name.startswith('.'):
+            continue
+        try:
+            key = slot_key(name)
+            if seen.get(name) != key:
+                seen[name] = key
+                cache_slot(name)
+        except (OSError, ValueError):
+            pass # being written or broken; load_slot will deal with it
+
+def receive(conn: socket.socket) -> tuple[dict, list[int]]:
+    """Receive a request and the client's stdin, stdout and stderr."""
+    data, fds, _, _ = socket.recv_fds(conn, 1 << 16, 3)
+    if len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        raise ConnectionError('no file descriptors received')
+    while len(data) < LENGTH.size \
+            or len(data) < LENGTH.size + LENGTH.unpack_from(data)[0]:
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            for fd in fds:
+                os.close(fd)
+            raise ConnectionError('request truncated')
+        data += chunk
+    return json.loads(data[LENGTH.size:]), fds
+
+def child(request: dict, fds: list[int]) -> int:
+    """Run the requested command as if the client had run it itself."""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, 'r', closefd=False)
+    sys.stdout = open(1, 'w', closefd=False)
+    sys.stderr = open(2, 'w', buffering=1, closefd=False)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    sys.argv = request['argv']
+    try:
+        run(sys.argv)
+    except SystemExit as exc:
+        code = exc.code
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    else:
+        code = 0
+    # same as what the interpreter does with SystemExit
+    if code is None:
+        code = 0
+    elif not isinstance(code, int):
+        print(code, file=sys.stderr)
+        code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return code
+
+def handle(conn: socket.socket, server: socket.socket) -> bool:
+    """Serve one request. Returns whether the daemon should stop."""
+    request, fds = receive(conn)
+    if request.get('stop'):
+        for fd in fds:
+            os.close(fd)
+        return True
+    # the child holds the write end until it exits
+    done_read, done_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        server.close()
+        conn.close()
+        os.close(done_read)
+        code = 1
+        try:
+            code = child(request, fds)
+        finally:
+            os._exit(code)
+    os.close(done_write)
+    for fd in fds:
+        os.close(fd)
+    waiting = [conn, done_read]
+    while done_read in waiting:
+        for ready in select.select(waiting, [], [])[0]:
+            if ready is conn:
+                if not conn.recv(1): # client went away, e.g. ^C
+                    os.kill(pid, signal.SIGINT)
+                    waiting.remove(conn)
+            elif not os.read(done_read, 1):
+                waiting.remove(done_read)
+    os.close(done_read)
+    code = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+    if code < 0: # killed by signal
+        code = 128 - code
+    try:
+        conn.sendall(STATUS.pack(code))
+    except OSError:
+        pass
+    return False
+
+def bind() -> socket.socket:
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(SOCKET)
+    except OSError:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(SOCKET)
+        except OSError: # stale socket left by a killed daemon
+            os.unlink(SOCKET)
+            server.bind(SOCKET)
+        else:
+            probe.close()
+            # untranslated: should not be encountered by regular users
+            sys.exit('game: error: daemon already running')
+    server.listen()
+    return server
+
+def stop() -> int:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(SOCKET)
+    except OSError:
+        return 1
+    with client:
+        request = json.dumps({'stop': True}).encode()
+        socket.send_fds(client, [LENGTH.pack(len(request)) + request],
+                        [0, 1, 2])
+    return 0
+
+def main(args: list[str]) -> int:
+    if args == ['stop']:
+        return stop()
+    if args:
+        # untranslated: should not be encountered by regular users
+        sys.exit('usage: python3 game --daemon [stop]')
+    # preload before detaching, in case the language needs choosing
+    seen = preload()
+    server = bind()
+    if os.fork():
+        return 0
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in range(3):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    if handle(conn, server):
+                        break
+                except (OSError, ValueError): # bad request
+                    continue
+            refresh(seen)
+    finally:
+        server.close()
+        os.unlink(SOCKET)
+    return 0
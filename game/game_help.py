@@ -1,19 +1,24 @@
 import os
 import argparse
+from functools import lru_cache
 from . import import_game
 from .i18n import i18n, pi18n
 
 CMDS = [name for name in os.listdir('commands') if '.' not in name]
 
-parser = argparse.ArgumentParser(
-    prog='game-help', description=i18n('game-help-desc'))
-parser.add_argument('cmd', nargs='?', default=None, choices=CMDS,
-                    help=i18n('game-help-cmd-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='game-help', description=i18n('game-help-desc'))
+    parser.add_argument('cmd', nargs='?', default=None, choices=CMDS,
+                        help=i18n('game-help-cmd-opt'))
+    return parser
 
 completion = f"-W '{' '.join(CMDS)}'"
 no_load_slot = True
 
 def main(args: list[str], slot: None = None):
+    parser = get_parser()
     cmdargs = parser.parse_args(args[1:])
     if cmdargs.cmd is not None:
         if cmdargs.cmd not in CMDS:
@@ -24,4 +29,4 @@ def main(args: list[str], slot: None = None):
     pi18n('game-help')
     for name in CMDS:
         game = import_game(name)
-        print(' ', name.ljust(width), game.parser.description)
\ No newline at end of file
+        print(' ', name.ljust(width), game.get_parser().description)
\ No newline at end of file
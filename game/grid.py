@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from decimal import Decimal
+from typing import Callable, Optional, TypeVar
+from .locking import write_atomic
+
+# magic, byte order of the cells, rows, columns, then rows * columns
+# float64 cells in row-major order
+MAGIC = b'IDLEGRID'
+HEADER = struct.Struct('<8s2s2xII4x')
+BYTEORDER = {'little': b'le', 'big': b'be'}[sys.byteorder]
+
+Mapped = TypeVar('Mapped')
+
+class Grid:
+    """A grid of floats memory-mapped from a file built by build(),
+    indexed like the list of lists in the JSON it was built from."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, self.rows, self.cols = HEADER.unpack_from(self._map)
+        if magic != MAGIC or byteorder != BYTEORDER:
+            # untranslated: should not be encountered by regular users
+            raise ValueError('%s is not a grid for this machine' % path)
+        self._cells = memoryview(self._map)[HEADER.size:].cast('d')
+        self._decimals: list[Optional[list[Decimal]]] = [None] * self.rows
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> memoryview:
+        """A row of the grid, without copying it."""
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError('grid index out of range')
+        return self._cells[row * self.cols:(row + 1) * self.cols]
+
+    def flat(self, start: int, stop: int) -> memoryview:
+        """Rows [start, stop) of the grid one after the other,
+        without copying them."""
+        return self._cells[start * self.cols:stop * self.cols]
+
+    def decimals(self, row: int) -> list[Decimal]:
+        """A row of the grid exactly as written in the JSON, as Decimals,
+        converted on first use."""
+        cells = self._decimals[row]
+        if cells is None:
+            # the JSON holds shortest float reprs, so this round-trips
+            cells = self._decimals[row] = [
+                Decimal(repr(cell)) for cell in self[row]]
+        return cells
+
+def binary_path(source: str) -> str:
+    return os.path.splitext(source)[0] + '.bin'
+
+def build(source: str):
+    """Convert a JSON grid into its binary form."""
+    with open(source) as f:
+        rows: list[list[float]] = json.load(f)
+    cells = array('d')
+    for row in rows:
+        cells.extend(row)
+    write(binary_path(source), len(rows), len(rows[0]), cells)
+
+def write(target: str, rows: int, cols: int, cells: array):
+    """Write a grid of ``rows`` * ``cols`` float64 ``cells`` to a file."""
+    # atomically, in case others are reading it
+    write_atomic(target, HEADER.pack(MAGIC, BYTEORDER, rows, cols)
+                 + cells.tobytes())
+
+def load_built(kind: Callable[[str], Mapped], target: str,
+               sources: list[str], build: Callable[[], None]) -> Mapped:
+    """Map ``target`` as ``kind``, (re)building it first with ``build``
+    if any of ``sources`` is newer or it was built on another machine."""
+    try:
+        built = os.stat(target).st_mtime_ns
+        fresh = all(built >= os.stat(source).st_mtime_ns
+                    for source in sources)
+    except FileNotFoundError:
+        fresh = False
+    if fresh:
+        try:
+            return kind(target)
+        except ValueError: # built on another machine, or by an older version
+            pass
+    build()
+    return kind(target)
+
+def load(source: str) -> Grid:
+    """Map the binary form of a JSON grid,
+    (re)building it first if the JSON is newer."""
+    return load_built(Grid, binary_path(source), [source],
+                      lambda: build(source))
+
+# summed-area tables: magic, byte order, rows, columns and scale of the
+# grid summed, then (rows + 1) * (columns + 1) unsigned 128-bit integers
+# (low then high uint64) in row-major order: the sum of every cell above
+# and to the left of each, exactly as written in the JSON * 10 ** scale;
+# then rows * columns bytes: the decimal places of each cell as written
+SUMS_MAGIC = b'IDLESUMS'
+SUMS_HEADER = struct.Struct('<8s2s2xIII8x')
+
+class SummedArea:
+    """The sum of any rectangle of a grid of non-negative cells, exactly
+    and in constant time, from a summed-area table memory-mapped from
+    a file built by build_sums()."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, self.rows, self.cols, self.scale \
+            = SUMS_HEADER.unpack_from(self._map)
+        places = SUMS_HEADER.size + 16 * (self.rows + 1) * (self.cols + 1)
+        if magic != SUMS_MAGIC or byteorder != BYTEORDER \
+                or len(self._map) != places + self.rows * self.cols:
+            # untranslated: should not be encountered by regular users
+            raise ValueError('%s is not a summed-area table for this machine'
+                             % path)
+        self._sums = memoryview(self._map)[SUMS_HEADER.size:places].cast('Q')
+        self._places = memoryview(self._map)[places:]
+
+    def _sum(self, row: int, col: int) -> int:
+        """The scaled sum of the cells above and left of (row, col)."""
+        index = 2 * (row * (self.cols + 1) + col)
+        return self._sums[index] | self._sums[index + 1] << 64
+
+    def scaled(self, top: int, left: int, bottom: int, right: int) -> int:
+        """The sum of rows [top, bottom) and columns [left, right),
+        times 10 ** scale."""
+        return (self._sum(bottom, right) - self._sum(top, right)
+                - self._sum(bottom, left) + self._sum(top, left))
+
+    def places(self, top: int, left: int, bottom: int, right: int) -> int:
+        """The most decimal places of any cell in rows [top, bottom)
+        and columns [left, right), as written in the JSON."""
+        if left >= right:
+            return 0
+        cols = self.cols
+        return max((max(self._places[row * cols + left:row * cols + right])
+                    for row in range(top, bottom)), default=0)
+
+    def decimal(self, scaled: int, places: int) -> Decimal:
+        """A sum from scaled() as a Decimal with ``places`` decimal places,
+        as adding up the cells (from places()) in Decimal would give."""
+        return Decimal(scaled // 10 ** (self.scale - places)).scaleb(-places)
+
+def sums_path(source: str) -> str:
+    return os.path.splitext(source)[0] + '.sums.bin'
+
+def build_sums(source: str):
+    """Build the summed-area table of a JSON grid."""
+    with open(source) as f:
+        # parsed as Decimals since only they hold the cells exactly
+        rows: list[list[Decimal]] = json.load(f, parse_float=Decimal)
+    cols = len(rows[0])
+    places = bytes(max(0, -Decimal(cell).as_tuple().exponent)
+                   for row in rows for cell in row)
+    scale = max(places)
+    sums = array('Q', bytes(16 * (cols + 1)))
+    above = [0] * (cols + 1)
+    for row in rows:
+        total = 0
+        sums.extend((0, 0))
+        for col, cell in enumerate(row, 1):
+            total += int(Decimal(cell).scaleb(scale))
+            above[col] += total
+            sums.extend((above[col] & (1 << 64) - 1, above[col] >> 64))
+    # atomically, in case others are reading it
+    write_atomic(sums_path(source), SUMS_HEADER.pack(
+        SUMS_MAGIC, BYTEORDER, len(rows), cols, scale)
+        + sums.tobytes() + places)
+
+def load_sums(source: str) -> SummedArea:
+    """Map the summed-area table of a JSON grid,
+    (re)building it first if the JSON is newer."""
+    return load_built(SummedArea, sums_path(source), [source],
+                      lambda: build_sums(source))
+
+if __name__ == '__main__':
+    for source in sys.argv[1:] or ['brightness.json', 'cubic_population.json']:
+        build(source)
@@ -1,15 +1,20 @@
 import argparse
+from functools import lru_cache
 from .slot import SaveSlot
 
 choices = ['hi', 'hello', 'hey']
 
-parser = argparse.ArgumentParser(
-    prog='hello', description='Hello World!')
-parser.add_argument('word', nargs='?', choices=choices,
-                    help='The greeting word')
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='hello', description='Hello World!')
+    parser.add_argument('word', nargs='?', choices=choices,
+                        help='The greeting word')
+    return parser
 
 completion = "-W '%s'" % ' '.join(choices)
+read_only = True
 
 def main(args: list[str], slot: SaveSlot):
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     print('Hello World!', (cmdargs.word or '').title())
\ No newline at end of file
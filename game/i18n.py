@@ -1,38 +1,53 @@
 import os
 import json
+from functools import lru_cache
 
-open('saves/.lang', 'a').close() # create file empty if not exists
+@lru_cache(maxsize=None)
+def get_lang() -> str:
+    """The language code in use, asking for it if none has been chosen."""
+    open('saves/.lang', 'a').close() # create file empty if not exists
 
-with open('saves/.lang', 'r') as lang:
-    LANG = lang.read().strip()
+    with open('saves/.lang', 'r') as lang:
+        LANG = lang.read().strip()
 
-if not LANG: # none set
-    # list of supported languages
-    langs = [name[:-5] for name in os.listdir('i18n')
-             if name.endswith('.json')]
-    langcount = len(langs) # precompute
-    for i, langcode in enumerate(langs, start=1):
-        with open('i18n/%s.json' % langcode, 'r') as lang:
-            data = json.load(lang)
-        # e.g. "1) English"
-        print('%s) %s' % (i, data['lang-name']))
-    choice = 0
-    while choice - 1 not in range(langcount):
-        # e.g. "1-5: "
-        choice = input('1-%s: ' % langcount)
-        try:
-            choice = int(choice)
-        except ValueError:
-            continue
-    LANG = langs[choice - 1]
-    with open('saves/.lang', 'w') as lang:
-        lang.write(LANG)
+    if not LANG: # none set
+        # list of supported languages
+        langs = [name[:-5] for name in os.listdir('i18n')
+                 if name.endswith('.json')]
+        langcount = len(langs) # precompute
+        for i, langcode in enumerate(langs, start=1):
+            with open('i18n/%s.json' % langcode, 'r') as lang:
+                data = json.load(lang)
+            # e.g. "1) English"
+            print('%s) %s' % (i, data['lang-name']))
+        choice = 0
+        while choice - 1 not in range(langcount):
+            # e.g. "1-5: "
+            choice = input('1-%s: ' % langcount)
+            try:
+                choice = int(choice)
+            except ValueError:
+                continue
+        LANG = langs[choice - 1]
+        with open('saves/.lang', 'w') as lang:
+            lang.write(LANG)
+    return LANG
 
-with open('i18n/%s.json' % LANG) as lang:
-    STRINGS: dict[str, str] = json.load(lang)
+@lru_cache(maxsize=None)
+def get_strings() -> dict[str, str]:
+    """The strings of the language in use, loaded on first use."""
+    with open('i18n/%s.json' % get_lang()) as lang:
+        return json.load(lang)
+
+def __getattr__(name: str):
+    if name == 'LANG':
+        return get_lang()
+    if name == 'STRINGS':
+        return get_strings()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 def i18n(key: str, *args) -> str:
-    return STRINGS[key].format(*args)
+    return get_strings()[key].format(*args)
 
 def pi18n(key: str, *args, **print_kwargs):
-    print(i18n(key, *args), **print_kwargs)
\ No newline at end of file
+    print(i18n(key, *args), **print_kwargs)
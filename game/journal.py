@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from .locking import write_atomic
+from .slot import SaveSlot, Views, _JL, _codec, _unpack
+
+# saves/<slot> is a snapshot in the same JSON as always, and
+# saves/.<slot>.journal holds what changed since, one JSON line per save:
+# {"snapshot": <sha1 of the snapshot>} first, then records of
+# {"at": <index>, "views": <Views.packed from that index on>, "fields": {...}}
+
+# compact the journal into the snapshot when it would grow past this
+JOURNAL_LIMIT = 1 << 20
+
+# how many saves in this process appended to a journal ('append'),
+# wrote a new snapshot ('compact'), or had nothing to write ('skip'),
+# and how many 'bytes read' and 'bytes written' in total
+counters: Counter[str] = Counter()
+
+@dataclass
+class Saved:
+    """What the files of a slot hold, as of the last load or save."""
+
+    slot: str
+    digest: str # sha1 of the snapshot
+    views: int # number of days of views
+    size: int # bytes of journal
+
+def snapshot_path(slot: str) -> str:
+    return 'saves/%s' % slot
+
+def journal_path(slot: str) -> str:
+    return 'saves/.%s.journal' % slot
+
+def read(slot: str) -> Optional[SaveSlot]:
+    """Load the snapshot of a slot and replay its journal on top.
+    Returns None if the slot is empty."""
+    with open(snapshot_path(slot), 'rb') as f:
+        raw = f.read()
+    counters['bytes read'] += len(raw)
+    if not raw:
+        return None
+    digest = hashlib.sha1(raw).hexdigest()
+    state: dict = json.loads(raw)
+    views = _codec(SaveSlot).decoders['views'](state.pop('views'))
+    if not isinstance(views, Views): # saved before Views existed
+        views = Views.from_pairs(views)
+    size = 0
+    try:
+        with open(journal_path(slot), 'rb') as f:
+            journal = f.read()
+        counters['bytes read'] += len(journal)
+    except FileNotFoundError:
+        journal = b''
+    lines = journal.split(b'\n')
+    try:
+        header = json.loads(lines[0]) if len(lines) > 1 else {}
+    except ValueError: # cut off halfway
+        header = {}
+    # the last line is empty unless a save was cut off halfway
+    if header.get('snapshot') == digest:
+        size = len(lines[0]) + 1
+        for line in lines[1:-1]:
+            try:
+                record = json.loads(line)
+            except ValueError: # cut off halfway, then appended to
+                break
+            at = record['at']
+            if at > len(views):
+                break
+            views.truncate(at)
+            views.extend_daily(_unpack(record['views']))
+            state.update(record['fields'])
+            size += len(line) + 1
+    # if the journal was left over from before the last compaction,
+    # it is now empty and will be overwritten on the next save
+    data: SaveSlot = _JL.unserialize(state)
+    data.views = views
+    data._saved = Saved(slot, digest, len(views), size)
+    data.mark_clean()
+    return data
+
+def write(slot: str, data: SaveSlot):
+    """Save a slot by appending what changed to its journal,
+    or by writing a new snapshot if there is no journal to append to.
+    Does nothing if the slot has not changed since it was loaded."""
+    saved: Optional[Saved] = getattr(data, '_saved', None)
+    if saved is None or saved.slot != slot:
+        return compact(slot, data)
+    dirty = data.dirty
+    if not dirty:
+        counters['skip'] += 1
+        return
+    encoders = _codec(type(data)).encoders
+    changed = {name: encoders[name](getattr(data, name))
+               for name in sorted(dirty) if name != 'views'}
+    views = data.views[saved.views:]
+    record = json.dumps({
+        'at': saved.views, 'views': views.packed, 'fields': changed}) + '\n'
+    if saved.size + len(record) > JOURNAL_LIMIT:
+        return compact(slot, data)
+    if saved.size:
+        mode, header = 'ab', ''
+    else: # start (or overwrite a stale) journal
+        mode, header = 'wb', json.dumps({'snapshot': saved.digest}) + '\n'
+    with open(journal_path(slot), mode) as f:
+        f.seek(saved.size) # drop anything cut off halfway
+        f.truncate()
+        counters['bytes written'] += f.write((header + record).encode())
+        f.flush()
+        os.fsync(f.fileno())
+    saved.views = len(data.views)
+    saved.size += len(header) + len(record)
+    data.mark_clean()
+    counters['append'] += 1
+
+def compact(slot: str, data: SaveSlot):
+    """Atomically replace the snapshot and drop the journal."""
+    raw = json.dumps(data.serialize(data)).encode()
+    counters['bytes written'] += write_atomic(snapshot_path(slot), raw)
+    # if this is never reached, the journal is recognised as stale
+    # by its snapshot digest and ignored
+    try:
+        os.unlink(journal_path(slot))
+    except FileNotFoundError:
+        pass
+    data._saved = Saved(slot, hashlib.sha1(raw).hexdigest(),
+                        len(data.views), 0)
+    data.mark_clean()
+    counters['compact'] += 1
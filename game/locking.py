@@ -0,0 +1,60 @@
+import os
+import fcntl
+
+# Commands hold a lock on saves/.<slot>.lock from loading a slot until
+# saving it: shared if the command is read_only, so that any number of
+# them can run at once, and exclusive otherwise. The lock is on a file of
+# its own because the snapshot is replaced, not rewritten, when saved.
+
+def lock_path(slot: str) -> str:
+    return 'saves/.%s.lock' % slot
+
+class SlotLock:
+    """An flock on a slot, held until release() or the end of a with."""
+
+    def __init__(self, slot: str, exclusive: bool):
+        self.slot = slot
+        self.exclusive = exclusive
+        self.fd = os.open(lock_path(slot), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX if exclusive
+                        else fcntl.LOCK_SH)
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def upgrade(self):
+        """Turn a shared lock exclusive. Not atomic: another command may
+        take the exclusive lock (and save the slot) in between."""
+        if not self.exclusive:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            self.exclusive = True
+
+    def release(self):
+        if self.fd >= 0:
+            os.close(self.fd) # which also unlocks
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def write_atomic(path: str, raw: bytes) -> int:
+    """Replace the file at ``path`` with ``raw``, so that it is always
+    found whole: either as it was or as it is now. Returns len(raw)."""
+    directory = os.path.dirname(path) or '.'
+    temp = os.path.join(directory, '.%s.%s.tmp' % (
+        os.path.basename(path).lstrip('.'), os.getpid()))
+    with open(temp, 'wb') as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return len(raw)
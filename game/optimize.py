@@ -0,0 +1,303 @@
+import io
+import os
+import json
+import math
+import hashlib
+import argparse
+import multiprocessing
+from decimal import Decimal
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from .completion import Node, Option, function_name
+from .locking import write_atomic
+from .simulate import MAX_DAYS, action, end_day, project
+from .slot import SaveSlot, ad_factor
+from .i18n import i18n, pi18n
+
+# results of earlier runs, by a hash of the slot and the arguments
+CACHE_DIRECTORY = 'saves/.optimize'
+CACHE_ENTRIES = 64
+# candidates are compared at these fractions of the days to simulate,
+# and dropped if they cannot end up ahead (see dominates())
+STAGES = (8, 4, 2, 1)
+# the first horizon to look for END at, doubled until any candidate gets there
+FIRST_HORIZON = 64
+
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='optimize', description=i18n('optimize-desc'))
+    parser.add_argument('days', nargs='?', type=int,
+                        help=i18n('optimize-days-opt'))
+    proportions = parser.add_mutually_exclusive_group()
+    proportions.add_argument('-g', '--grid', type=int, default=20,
+                             metavar='steps', help=i18n('optimize-grid-opt'))
+    proportions.add_argument('-p', '--proportions', type=Decimal, nargs='+',
+                             metavar='proportion',
+                             help=i18n('optimize-proportions-opt'))
+    parser.add_argument('-s', '--schedule', action='append', default=[],
+                        metavar='day:command;...',
+                        help=i18n('optimize-schedule-opt'))
+    parser.add_argument('-n', '--top', type=int, default=5, metavar='count',
+                        help=i18n('optimize-top-opt'))
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        metavar='workers', help=i18n('optimize-jobs-opt'))
+    return parser
+
+completion_tree = {
+    None: Node(['-h', '--help'], [
+        Option('-g', '--grid', '-p', '--proportions', values=[]),
+        Option('-s', '--schedule', values=[]),
+        Option('-n', '--top', values=[]),
+        Option('-j', '--jobs', values=[]),
+    ]),
+}
+completion = "-o nosort -F %s" % function_name('optimize')
+read_only = True # candidates are only ever simulated
+
+@dataclass
+class Candidate:
+    """An ad proportion to set now, and commands to run on later days."""
+
+    proportion: Decimal
+    schedule: str # as given on the command line, '' for none
+    planned: list[tuple[int, list[str]]]
+
+    @property
+    def last_action(self) -> int:
+        return max((day for day, _ in self.planned), default=0)
+
+@dataclass
+class Outcome:
+    """Where a candidate stands after simulating it up to some day."""
+
+    today: int
+    money: Decimal
+    views: int # cumulative
+    view_rate: int
+    pending: int # transactions not cleared yet
+    end: Optional[int] # the day END was reached on
+
+def revenue(proportion: Decimal) -> Decimal:
+    """Money made a day per view of view rate, with this proportion of
+    ads, as in SaveSlot.update()."""
+    return proportion * ad_factor(proportion)
+
+def dominates(a: Candidate, a_is: Outcome, b: Candidate, b_is: Outcome) -> bool:
+    """Whether ``a`` is sure to end up at least as well off as ``b``
+    on both money and views, whatever the number of days simulated.
+
+    That is the case once both have run all their commands, with the
+    same schedule (so the same boosts), and ``a`` has no less money,
+    views or view rate, and an ad proportion that makes no fewer views
+    nor less money a day for the same rate. It then stays ahead on all
+    of those, since the log10 bonus only grows with cumulative views.
+    """
+    return (a.schedule == b.schedule
+            and a_is.today > a.last_action and not a_is.pending
+            and b_is.today > b.last_action and not b_is.pending
+            and a.proportion <= b.proportion
+            and revenue(a.proportion) >= revenue(b.proportion)
+            and a_is.money >= b_is.money and a_is.views >= b_is.views
+            and a_is.view_rate >= b_is.view_rate)
+
+# set once per worker process, so that they are not sent
+# the slot (which may have a long history) with every job
+_slot: SaveSlot
+_candidates: list[Candidate]
+
+def set_globals(slot: SaveSlot, options: list[Candidate]):
+    global _slot, _candidates
+    _slot, _candidates = slot, options
+
+def evaluate(job: tuple[int, int]) -> tuple[int, Optional[Outcome], str]:
+    """Simulate a candidate a number of days forward."""
+    index, days = job
+    candidate = _candidates[index]
+    planned = [(_slot.today, ['change', 'ads', str(candidate.proportion)])]
+    errors = io.StringIO()
+    try:
+        with open(os.devnull, 'w') as devnull, \
+                redirect_stdout(devnull), redirect_stderr(errors):
+            projection = project(_slot, planned + candidate.planned, days)
+    except (Exception, SystemExit) as exc:
+        # a schedule that cannot be followed only rules out itself;
+        # argparse errors are printed before exiting with status 2
+        lines = errors.getvalue().splitlines()
+        if isinstance(exc, SystemExit) and lines:
+            return index, None, lines[-1]
+        return index, None, str(exc) or type(exc).__name__
+    return index, Outcome(
+        projection.today, projection.money, projection.views_total,
+        projection.view_rate, len(projection.transactions_pending),
+        end_day(projection)), ''
+
+def candidates(cmdargs: argparse.Namespace, today: int) -> list[Candidate]:
+    parser = get_parser()
+    if cmdargs.proportions:
+        proportions = cmdargs.proportions
+    else:
+        if cmdargs.grid < 1:
+            parser.error(i18n('error-optimize-grid-oor'))
+        proportions = [Decimal(i) / cmdargs.grid
+                       for i in range(cmdargs.grid + 1)]
+    for proportion in proportions:
+        if not (0 <= proportion <= 1):
+            parser.error(i18n('error-proportion-oor'))
+    schedules: list[tuple[str, list[tuple[int, list[str]]]]] = [('', [])]
+    for schedule in cmdargs.schedule:
+        planned = []
+        for step in schedule.split(';'):
+            day, sep, command = step.partition(':')
+            if not sep:
+                parser.error(i18n('error-optimize-schedule', step))
+            planned.append(action(day.strip(), command, today, parser))
+        schedules.append((schedule, planned))
+    return [Candidate(proportion, schedule, planned)
+            for schedule, planned in schedules
+            for proportion in proportions]
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """A hash of the source of the game, which rankings were made by."""
+    digest = hashlib.sha1()
+    package = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package)):
+        if name.endswith('.py'):
+            digest.update(name.encode() + b'\0')
+            with open(os.path.join(package, name), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def cache_key(slot: SaveSlot, cmdargs: argparse.Namespace,
+              options: list[Candidate]) -> str:
+    state = slot.serialize(slot)
+    # last_touch changes with every command, but only today matters
+    del state['last_touch']
+    question = [slot.today, cmdargs.days,
+                [(str(c.proportion), c.schedule) for c in options]]
+    # so that rankings made before the game changed are not shown
+    state = json.dumps([code_version(), state, question], sort_keys=True)
+    return hashlib.sha1(state.encode()).hexdigest()
+
+def cached(key: str) -> Optional[list]:
+    try:
+        with open(os.path.join(CACHE_DIRECTORY, key + '.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def cache(key: str, ranking: list):
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+    write_atomic(os.path.join(CACHE_DIRECTORY, key + '.json'),
+                 json.dumps(ranking).encode())
+    # forget the least recently written beyond CACHE_ENTRIES
+    entries = sorted(
+        (entry for entry in os.scandir(CACHE_DIRECTORY)
+         if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[CACHE_ENTRIES:]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+def search(cmdargs: argparse.Namespace, slot: SaveSlot,
+           options: list[Candidate], pool) -> list:
+    """Simulate the candidates in stages, dropping those that fall behind.
+    Returns [index, money, END day or None, pruned on day or None, error]
+    for each candidate, best first."""
+    set_globals(slot, options)
+    mapper = map if pool is None else pool.imap_unordered
+    alive = list(range(len(options)))
+    outcomes: dict[int, Outcome] = {}
+    pruned: dict[int, int] = {}
+    errors: dict[int, str] = {}
+    if cmdargs.days is not None:
+        horizons = [max(cmdargs.days // stage, 1) for stage in STAGES]
+    else:
+        horizons = []
+        horizon = FIRST_HORIZON
+        while horizon < MAX_DAYS:
+            horizons.append(horizon)
+            horizon *= 2
+        horizons.append(MAX_DAYS)
+    for horizon in horizons:
+        for index, outcome, error in mapper(
+                evaluate, [(index, horizon) for index in alive]):
+            if outcome is None:
+                errors[index] = error
+                alive.remove(index)
+            else:
+                outcomes[index] = outcome
+        if cmdargs.days is None:
+            if any(outcomes[index].end is not None for index in alive):
+                # everything else reaches END after this horizon, if ever
+                for index in alive:
+                    if outcomes[index].end is None:
+                        pruned[index] = outcomes[index].today
+                alive = [index for index in alive if index not in pruned]
+                break
+            continue
+        for b in alive:
+            for a in alive:
+                if a != b and a not in pruned and dominates(
+                        options[a], outcomes[a], options[b], outcomes[b]):
+                    pruned[b] = outcomes[b].today
+                    break
+        alive = [index for index in alive if index not in pruned]
+    def rank(index: int):
+        outcome = outcomes.get(index)
+        if outcome is None:
+            return (2, 0, 0)
+        if index in pruned:
+            return (1, 0, -outcome.money)
+        return (0, outcome.end if outcome.end is not None else math.inf,
+                -outcome.money)
+    ranking = []
+    for index in sorted(range(len(options)), key=rank):
+        outcome = outcomes.get(index)
+        ranking.append([
+            index, None if outcome is None else str(outcome.money),
+            None if outcome is None else outcome.end,
+            pruned.get(index), errors.get(index)])
+    return ranking
+
+def main(args: list[str], slot: SaveSlot):
+    parser = get_parser()
+    cmdargs = parser.parse_args(args[1:])
+    if cmdargs.days is not None and cmdargs.days < 1:
+        parser.error(i18n('error-optimize-days-oor'))
+    if cmdargs.jobs < 1:
+        parser.error(i18n('error-jobs-oor'))
+    options = candidates(cmdargs, slot.today)
+    key = cache_key(slot, cmdargs, options)
+    ranking = cached(key)
+    if ranking is None:
+        workers = min(cmdargs.jobs, len(options))
+        if workers <= 1:
+            ranking = search(cmdargs, slot, options, None)
+        else:
+            with multiprocessing.Pool(
+                    workers, initializer=set_globals,
+                    initargs=(slot, options)) as pool:
+                ranking = search(cmdargs, slot, options, pool)
+        cache(key, ranking)
+    pi18n('optimize-header')
+    for index, money, end, pruned, error in ranking[:cmdargs.top]:
+        option = options[index]
+        if error is not None:
+            result = i18n('optimize-failed', error)
+        elif pruned is not None:
+            result = i18n('optimize-pruned', pruned)
+        elif cmdargs.days is None:
+            result = i18n('optimize-result-end', end, money) \
+                if end is not None \
+                else i18n('optimize-result-no-end', money)
+        else:
+            result = i18n('optimize-result', money)
+        print(option.proportion, option.schedule or '-', result, sep='\t')
+    pi18n('optimize-summary', len(options),
+          sum(pruned is not None for _, _, _, pruned, _ in ranking))
@@ -0,0 +1,188 @@
+import math
+import heapq
+from array import array
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+from .grid import Grid, load_built, sums_path, write as write_grid
+from .slot import GRIDS, CDNSetup, SaveSlot, grid, sums
+
+# Ranks every place a CDN server could be bought by boost, or by boost
+# for the money, from an index of the boost and the population() around
+# each cell. The cost of a server is linear in the difficulty multiplier,
+# so the index keeps the two terms of that line, and any difficulty can
+# be ranked without rebuilding it. Floats only shortlist the cells;
+# what is shown is ranked exactly as CDNSetup.cost() would have it.
+
+# the index is a grid (see grid.py) of LAYERS stacked one under the other:
+# each cell's boost, the slope and intercept of its cost against the
+# difficulty multiplier, the cell numbers by descending boost, and then
+# by descending boost per unit of cost at each of RATIO_DIFFICULTIES.
+# It is rebuilt when anything it is built from is newer, or RADIUS changes
+INDEX = 'cdn_index.r%d.bin'
+# a ratio query walks down the ordering at the highest of these that is
+# not above its difficulty, so the closer they are, the sooner it stops
+RATIO_DIFFICULTIES = (0, 1/4096, 1/1024, 1/256, 1/64, 1/16, 1/4, 1, 4, 16)
+LAYERS = 4 + len(RATIO_DIFFICULTIES)
+# how far apart (relatively) floats must be to be trusted to rank cells;
+# anything closer is decided in Decimal
+EPSILON = 1e-9
+
+def index_path() -> str:
+    return INDEX % CDNSetup.RADIUS
+
+def build_index(target: str):
+    brightness = grid('BRIGHTNESS')
+    rows, cols = brightness.rows, brightness.cols
+    boosts = array('d')
+    slopes = array('d')
+    intercepts = array('d')
+    for row in range(rows):
+        boosts.extend(map(round, brightness[row]))
+        for col in range(cols):
+            total = float(CDNSetup.population(90 - row, col - 180))
+            intercept = CDNSetup.cost_of(total, 0)
+            intercepts.append(intercept)
+            slopes.append(CDNSetup.cost_of(total, 1) - intercept)
+    # best first, then north-west first
+    layers = boosts + slopes + intercepts + array('d', sorted(
+        range(rows * cols), key=boosts.__getitem__, reverse=True))
+    for difficulty in RATIO_DIFFICULTIES:
+        ratios = [boost / (slope * difficulty + intercept) for boost, slope,
+                  intercept in zip(boosts, slopes, intercepts)]
+        layers.extend(sorted(range(rows * cols), key=ratios.__getitem__,
+                             reverse=True))
+    write_grid(target, rows * LAYERS, cols, layers)
+
+def open_index(path: str) -> Grid:
+    """Map the index at ``path``, checking that it has every layer."""
+    index = Grid(path)
+    if index.rows != LAYERS * grid('BRIGHTNESS').rows:
+        # untranslated: should not be encountered by regular users
+        raise ValueError('%s is not an index of %d layers' % (path, LAYERS))
+    return index
+
+def load_index() -> Grid:
+    target = index_path()
+    sums('POPULATION') # (re)built first if need be
+    sources = [*GRIDS.values(), sums_path(GRIDS['POPULATION'])]
+    return load_built(open_index, target, sources,
+                      lambda: build_index(target))
+
+class Index:
+    """The boost of every cell, its cost as ``slope * difficulty
+    + intercept``, the cells by descending boost (``by_boost``) and by
+    descending boost per unit of cost at each of RATIO_DIFFICULTIES
+    (``by_ratio``), all read from the mapped index as floats.
+    Cells are numbered ``row * cols + col`` of the grids."""
+
+    def __init__(self):
+        grid = load_index()
+        self.rows, self.cols = grid.rows // LAYERS, grid.cols
+        layers = [grid.flat(layer * self.rows, (layer + 1) * self.rows)
+                  for layer in range(LAYERS)]
+        self.boosts, self.slopes, self.intercepts, self.by_boost \
+            = layers[:4]
+        self.by_ratio = dict(zip(RATIO_DIFFICULTIES, layers[4:]))
+
+    def cell(self, lat: int, long: int) -> Optional[int]:
+        row, col = 90 - lat, (180 + long) % self.cols
+        if 0 <= row < self.rows:
+            return row * self.cols + col
+        return None
+
+    def coords(self, cell: int) -> tuple[int, int]:
+        row, col = divmod(cell, self.cols)
+        return 90 - row, col - 180
+
+@lru_cache(maxsize=None)
+def index() -> Index:
+    return Index()
+
+def best(slot: SaveSlot, count: int, by: str = 'ratio',
+         budget: Optional[Decimal] = None) -> list[tuple[CDNSetup, int, Decimal]]:
+    """The ``count`` best places for a new CDN server, best first,
+    with their boost and cost: by boost per unit of cost ('ratio') or by
+    boost alone ('boost'), among those costing at most ``budget``, if given.
+    Places that already have a server, or one pending, are left out."""
+    idx = index()
+    taken = {tuple(coords) for coords in slot.cdn_servers}
+    taken.update(trans.action.coords for trans in slot.transactions_pending
+                 if isinstance(trans.action, CDNSetup))
+    excluded = {idx.cell(lat, long) for lat, long in taken} - {None}
+    difficulty = float(slot.difficulty_multiplier)
+    boosts, slopes, intercepts = idx.boosts, idx.slopes, idx.intercepts
+    exact: dict[int, Decimal] = {}
+
+    # nobody lives around most of the grid (the oceans), and those
+    # places all cost the same; populations are never negative, so
+    # only they have a zero slope
+    unpopulated = CDNSetup.cost_of(Decimal(), slot.difficulty_multiplier)
+
+    def cost(cell: int) -> Decimal:
+        if not slopes[cell]:
+            return unpopulated
+        if cell not in exact:
+            exact[cell] = CDNSetup(*idx.coords(cell)).cost(slot)
+        return exact[cell]
+
+    def estimate(cell: int) -> float:
+        return slopes[cell] * difficulty + intercepts[cell]
+
+    # estimates below low are surely affordable, and above high surely not
+    if budget is None:
+        low = high = math.inf
+    else:
+        low, high = float(budget) * (1 - EPSILON), float(budget) * (1 + EPSILON)
+
+    def affordable(cell: int) -> bool:
+        price = estimate(cell)
+        return price < low or price <= high and cost(cell) <= budget
+
+    if by == 'boost':
+        # boosts are exact; walk down until past the count-th one
+        shortlist: list[int] = []
+        for cell in map(int, idx.by_boost):
+            if len(shortlist) >= count \
+                    and boosts[cell] < boosts[shortlist[count - 1]]:
+                break
+            if cell not in excluded and affordable(cell):
+                shortlist.append(cell)
+        # ties are broken by the lower cost
+        shortlist.sort(key=lambda cell: (-boosts[cell], estimate(cell), cell))
+        if len(shortlist) > count:
+            last = shortlist[count - 1]
+            cutoff = estimate(last) * (1 + EPSILON)
+            shortlist = shortlist[:count] + [
+                cell for cell in shortlist[count:]
+                if boosts[cell] == boosts[last] and estimate(cell) <= cutoff]
+        shortlist.sort(key=lambda cell: (-boosts[cell], cost(cell), cell))
+    else:
+        # walk down the cells by their ratio at the highest difficulty
+        # prepared that is not above this one: ratios only fall as the
+        # difficulty rises, so once the ratio there is below the cut,
+        # nothing further down can make it
+        floor = max(prepared for prepared in RATIO_DIFFICULTIES
+                    if prepared <= difficulty)
+        scores: dict[int, float] = {}
+        top: list[float] = [] # a min-heap of the count best scores
+        # everything that floats cannot tell apart from the count-th
+        cutoff = -math.inf
+        for cell in map(int, idx.by_ratio[floor]):
+            if boosts[cell] / (slopes[cell] * floor + intercepts[cell]) \
+                    < cutoff:
+                break
+            if cell in excluded or not affordable(cell):
+                continue
+            score = scores[cell] = boosts[cell] / estimate(cell)
+            if len(top) < count:
+                heapq.heappush(top, score)
+            elif score > top[0]:
+                heapq.heapreplace(top, score)
+            if len(top) == count:
+                cutoff = top[0] - abs(top[0]) * EPSILON
+        shortlist = [cell for cell, score in scores.items()
+                     if score >= cutoff]
+        shortlist.sort(key=lambda cell: (-int(boosts[cell]) / cost(cell), cell))
+    return [(CDNSetup(*idx.coords(cell)), int(boosts[cell]), cost(cell))
+            for cell in shortlist[:count]]
@@ -0,0 +1,81 @@
+from collections.abc import Sequence
+
+# Views over time are downsampled to what can be seen before drawing
+# them, so that drawing takes as long for a million days as for a
+# thousand: each bucket of days keeps only its lowest and highest day,
+# which is all that a pixel (or character) column can show of it anyway.
+# The terminal renderers need nothing but the standard library.
+
+# from lowest to highest, for sparkline()
+BARS = '▁▂▃▄▅▆▇█'
+
+def buckets(count: int, width: int) -> list[range]:
+    """Split ``count`` points into ``width`` (or fewer) even ranges."""
+    if not count:
+        return []
+    width = max(min(width, count), 1)
+    return [range(i * count // width, (i + 1) * count // width)
+            for i in range(width)]
+
+def minmax(values: Sequence[int], width: int) -> tuple[list[int], list[int]]:
+    """The indices and values of the lowest and highest of ``values`` in
+    each of ``width`` buckets, in order: at most 2 * ``width`` points
+    whose line has the same envelope as that of all of them."""
+    if len(values) <= 2 * width:
+        return list(range(len(values))), list(values)
+    indices, sampled = [], []
+    for bucket in buckets(len(values), width):
+        chunk = values[bucket.start:bucket.stop]
+        low = chunk.index(min(chunk))
+        high = chunk.index(max(chunk))
+        for i in sorted({low, high}):
+            indices.append(bucket.start + i)
+            sampled.append(chunk[i])
+    return indices, sampled
+
+def sparkline(values: Sequence[int], width: int) -> str:
+    """One character per bucket of ``values``, as high as its mean."""
+    means = [sum(values[bucket.start:bucket.stop]) / len(bucket)
+             for bucket in buckets(len(values), width)]
+    if not means:
+        return ''
+    low, high = min(means), max(means)
+    scale = (len(BARS) - 1) / (high - low) if high > low else 0
+    return ''.join(BARS[round((mean - low) * scale)] for mean in means)
+
+def chart(values: Sequence[int], width: int, height: int,
+          start: int = 0) -> list[str]:
+    """Lines of an ASCII chart of ``values`` at most ``width`` wide:
+    ``height`` rows of plot, each column spanning the lowest to the
+    highest value of its bucket, with the highest and lowest value on
+    the left and the indices of the first and last value (counting
+    from ``start``) below."""
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    margin = max(len(str(low)), len(str(high)))
+    columns = buckets(len(values), max(width - margin - 2, 1))
+    spans = []
+    for bucket in columns:
+        chunk = values[bucket.start:bucket.stop]
+        spans.append((min(chunk), max(chunk)))
+    def row(value: int) -> int:
+        if high == low:
+            return 0
+        return round((value - low) * (height - 1) / (high - low))
+    lines = []
+    for level in reversed(range(height)):
+        if level == height - 1:
+            label = str(high)
+        elif level == 0:
+            label = str(low)
+        else:
+            label = ''
+        lines.append('%*s |%s' % (margin, label, ''.join(
+            '#' if row(bottom) <= level <= row(top) else ' '
+            for bottom, top in spans).rstrip()))
+    lines.append('%*s +%s' % (margin, '', '-' * len(spans)))
+    first, last = str(start), str(start + len(values) - 1)
+    lines.append('%*s  %s%*s' % (margin, '', first, max(
+        len(spans) - len(first), len(last) + 1), last))
+    return lines
@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+from time import perf_counter, process_time, time
+from contextlib import contextmanager
+from typing import Optional
+from .journal import counters
+
+# IDLESITE_PROFILE is a comma-separated list of these:
+# phases: print the wall and CPU time of each phase to stderr
+# cprofile: dump a cProfile .prof of each command to the profile directory
+# log: append a JSON line per command to log.jsonl in the profile directory
+MODES = ('phases', 'cprofile', 'log')
+# where cprofile and log write to, relative to the working directory
+DEFAULT_DIRECTORY = 'profiles'
+
+class Session:
+    """Timings and counts for one command, reported when it finishes."""
+
+    def __init__(self, argv: list[str], modes: set[str]):
+        self.argv = list(argv)
+        self.modes = modes
+        self.directory = os.environ.get(
+            'IDLESITE_PROFILE_DIR', DEFAULT_DIRECTORY)
+        self.phases: dict[str, tuple[float, float]] = {}
+        self.slot: Optional[str] = None
+        self.days = 0 # simulated by update()
+        self.status = 0
+        self.before = counters.copy()
+        self.started = time()
+        self.profiler = None
+        if 'cprofile' in modes:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def phase(self, name: str,
+              since: Optional[tuple[float, float]] = None):
+        """Time the body of the with statement as the phase ``name``,
+        or from ``since`` (perf_counter() and process_time()) if given."""
+        wall, cpu = since or (perf_counter(), process_time())
+        try:
+            yield
+        finally:
+            self.phases[name] = (perf_counter() - wall, process_time() - cpu)
+
+    def finish(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        delta = counters.copy()
+        delta.subtract(self.before)
+        name = '%s-%d-%d' % (self.argv[0], self.started, os.getpid())
+        if 'phases' in self.modes:
+            for phase, (wall, cpu) in self.phases.items():
+                print('profile: %-8s %9.2f ms wall %9.2f ms cpu' % (
+                    phase, wall * 1000, cpu * 1000), file=sys.stderr)
+            print('profile: %d days simulated, %d bytes read, '
+                  '%d bytes written' % (self.days, delta['bytes read'],
+                                        delta['bytes written']),
+                  file=sys.stderr)
+        if self.profiler is not None or 'log' in self.modes:
+            os.makedirs(self.directory, exist_ok=True)
+        if self.profiler is not None:
+            path = os.path.join(self.directory, name + '.prof')
+            self.profiler.dump_stats(path)
+            if 'phases' in self.modes:
+                print('profile: written to %s' % path, file=sys.stderr)
+        if 'log' in self.modes:
+            record = {
+                'time': self.started,
+                'command': self.argv[0],
+                'argv': self.argv,
+                'slot': self.slot,
+                'status': self.status,
+                'days': self.days,
+                'bytes read': delta['bytes read'],
+                'bytes written': delta['bytes written'],
+                'phases': {phase: {'wall': wall, 'cpu': cpu}
+                           for phase, (wall, cpu) in self.phases.items()},
+            }
+            # a single write in append mode,
+            # so that lines from concurrent commands do not interleave
+            with open(os.path.join(self.directory, 'log.jsonl'), 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+class NoSession:
+    """What run() gets when profiling is off: does nothing."""
+
+    slot = None
+    days = 0
+    status = 0
+
+    @contextmanager
+    def phase(self, name: str,
+              since: Optional[tuple[float, float]] = None):
+        yield
+
+def modes() -> set[str]:
+    """The profiling modes switched on by IDLESITE_PROFILE."""
+    value = os.environ.get('IDLESITE_PROFILE', '')
+    chosen = {mode.strip() for mode in value.split(',') if mode.strip()}
+    unknown = chosen - set(MODES)
+    if unknown:
+        # untranslated: should not be encountered by regular users
+        sys.exit('game: error: unknown IDLESITE_PROFILE mode(s): %s'
+                 % ', '.join(sorted(unknown)))
+    return chosen
+
+@contextmanager
+def session(argv: list[str]):
+    """Profile the command run in the body of the with statement,
+    in whichever modes IDLESITE_PROFILE asks for."""
+    chosen = modes()
+    if not chosen:
+        yield NoSession()
+        return
+    profile = Session(argv, chosen)
+    try:
+        yield profile
+    except SystemExit as exc:
+        profile.status = exc.code if isinstance(exc.code, int) \
+            else int(exc.code is not None)
+        raise
+    except BaseException:
+        profile.status = 1
+        raise
+    finally:
+        profile.finish()
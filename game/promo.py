@@ -1,22 +1,31 @@
 import argparse
+from functools import lru_cache
 from .slot import Channels, Friends, SaveSlot
 from .i18n import i18n
 
-parser = argparse.ArgumentParser(prog='promo', description=i18n('promo-desc'))
-subparsers = parser.add_subparsers(
-    dest='cmd', required=True, title=i18n('subcommands'))
+# built by get_parser()
+friends_parser: argparse.ArgumentParser
+channels_parser: argparse.ArgumentParser
 
-friends_parser = subparsers.add_parser(
-    'friends', description=i18n('promo-friends-desc'))
-friends_parser.add_argument(
-    'count', nargs='?', type=int,
-    help=i18n('promo-friends-count-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    global friends_parser, channels_parser
+    parser = argparse.ArgumentParser(prog='promo', description=i18n('promo-desc'))
+    subparsers = parser.add_subparsers(
+        dest='cmd', required=True, title=i18n('subcommands'))
 
-channels_parser = subparsers.add_parser(
-    'channels', description=i18n('promo-channels-desc'))
-channels_parser.add_argument(
-    'count', nargs='?', type=int,
-    help=i18n('promo-channels-count-opt'))
+    friends_parser = subparsers.add_parser(
+        'friends', description=i18n('promo-friends-desc'))
+    friends_parser.add_argument(
+        'count', nargs='?', type=int,
+        help=i18n('promo-friends-count-opt'))
+
+    channels_parser = subparsers.add_parser(
+        'channels', description=i18n('promo-channels-desc'))
+    channels_parser.add_argument(
+        'count', nargs='?', type=int,
+        help=i18n('promo-channels-count-opt'))
+    return parser
 
 completion = "-o nosort -W '-h --help friends channels'"
 
@@ -41,5 +50,5 @@ def channels(cmdargs: argparse.Namespace, slot: SaveSlot):
     Channels(cmdargs.count).activate(slot)
 
 def main(args: list[str], slot: SaveSlot):
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     return globals()[cmdargs.cmd](cmdargs, slot)
\ No newline at end of file
@@ -1,25 +1,37 @@
 import argparse
+from functools import lru_cache
 from decimal import Decimal
 import os
 from . import save_slot
+from .locking import write_atomic
+from .completion import SLOTS, Node, Option, function_name
 from .slot import SaveSlot
 from .i18n import i18n, pi18n
 
-parser = argparse.ArgumentParser(
-    prog='select-slot', description=i18n('select-slot-desc'))
-parser.add_argument('slot', help=i18n('select-slot-slot-opt'))
-parser.add_argument(
-    '-f', '--force-create', action='store_true', dest='force',
-    help=i18n('select-slot-force-create-opt'))
-parser.add_argument(
-    '-I', '--non-interactive', action='store_false', dest='interactive',
-    help=i18n('select-slot-non-interactive-opt'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='select-slot', description=i18n('select-slot-desc'))
+    parser.add_argument('slot', help=i18n('select-slot-slot-opt'))
+    parser.add_argument(
+        '-f', '--force-create', action='store_true', dest='force',
+        help=i18n('select-slot-force-create-opt'))
+    parser.add_argument(
+        '-I', '--non-interactive', action='store_false', dest='interactive',
+        help=i18n('select-slot-non-interactive-opt'))
+    return parser
 
-completion = "-o nosort -W '-f --force-create -I --non-interactive'"
+completion_tree = {
+    None: Node([SLOTS], [
+        Option('-f', '--force-create'),
+        Option('-I', '--non-interactive'),
+    ]),
+}
+completion = "-o nosort -F %s" % function_name('select-slot')
 no_load_slot = True
 
 def main(args: list[str], slot: None = None) -> int:
-    cmdargs = parser.parse_args(args[1:])
+    cmdargs = get_parser().parse_args(args[1:])
     slot = cmdargs.slot
     if not os.path.exists('saves/%s' % slot) and not cmdargs.force:
         if not cmdargs.interactive:
@@ -29,6 +41,5 @@ def main(args: list[str], slot: None = None) -> int:
             pass
         else:
             return 1
-    with open('saves/.current', 'w') as slotfile:
-        slotfile.write(slot)
+    write_atomic('saves/.current', slot.encode())
     return 0
\ No newline at end of file
@@ -0,0 +1,112 @@
+import copy
+import shlex
+import argparse
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional
+from . import import_game
+from .completion import Node, Option, function_name
+from .slot import END, SaveSlot
+from .i18n import i18n, pi18n
+
+# commands that can be applied to the projection with --on
+ACTIONS = ['buy', 'cancel', 'change', 'promo']
+# how far to look for END when no number of days is given
+MAX_DAYS = 10 ** 7
+
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='simulate', description=i18n('simulate-desc'))
+    parser.add_argument('days', nargs='?', type=int,
+                        help=i18n('simulate-days-opt'))
+    parser.add_argument('--on', nargs=2, action='append', default=[],
+                        metavar=('day', 'command'),
+                        help=i18n('simulate-on-opt'))
+    return parser
+
+completion_tree = {
+    None: Node(['-h', '--help'], [Option('--on', values=[])]),
+}
+completion = "-o nosort -F %s" % function_name('simulate')
+read_only = True # the projection is never saved
+
+def advance(slot: SaveSlot, day: int):
+    """Run update() on ``slot`` as if it were now the start of ``day``."""
+    if day > slot.today:
+        slot.update(slot.first_touch + day * slot.day_length)
+
+def end_day(slot: SaveSlot) -> Optional[int]:
+    """The day on which the cumulative views first reached END, if any,
+    as the today it would have been congratulated on."""
+    day = bisect_left(slot.views.cumulative, END)
+    if day == len(slot.views):
+        return None
+    return day + 1
+
+def action(day: str, command: str, today: int, last: Optional[int],
+           parser: argparse.ArgumentParser) -> tuple[int, list[str]]:
+    """Parse a command to run on the projection on ``day``,
+    which must be from ``today`` to ``last``, if given, inclusive."""
+    try:
+        number = int(day)
+    except ValueError:
+        parser.error(i18n('error-simulate-day', day))
+    if number < today:
+        parser.error(i18n('error-simulate-past', number))
+    if last is not None and number > last:
+        # it would only take the projection past the days asked for
+        parser.error(i18n('error-simulate-beyond', number, last))
+    argv = shlex.split(command)
+    if not argv or argv[0] not in ACTIONS:
+        parser.error(i18n('error-simulate-action', command,
+                          ', '.join(ACTIONS)))
+    return number, argv
+
+def project(slot: SaveSlot, planned: list[tuple[int, list[str]]],
+            days: Optional[int]) -> SaveSlot:
+    """A copy of ``slot``, with the ``planned`` commands run on it on their
+    days, simulated ``days`` days forward, or until END if None."""
+    projection = copy.deepcopy(slot)
+    # never prompt about END, or write anything, for a projection
+    projection.continued = True
+    projection.__dict__.pop('_saved', None)
+    # in the order given when on the same day
+    for day, argv in sorted(planned, key=lambda action: action[0]):
+        advance(projection, day)
+        import_game(argv[0]).main(argv, projection)
+    if days is not None:
+        advance(projection, slot.today + days)
+        return projection
+    # look for END in doubling steps, then simulate up to the day it
+    # is reached in one go, since update() charges for transactions
+    # as of the day it is run on, and so does `simulate <days>`
+    start = copy.deepcopy(projection)
+    step = 1
+    limit = slot.today + MAX_DAYS
+    while projection.views_total < END and projection.today < limit:
+        advance(projection, min(projection.today + step, limit))
+        step *= 2
+    day = end_day(projection)
+    if day is not None and day < projection.today:
+        projection = start
+        advance(projection, day)
+    return projection
+
+def main(args: list[str], slot: SaveSlot):
+    cmdargs = get_parser().parse_args(args[1:])
+    if cmdargs.days is not None and cmdargs.days < 0:
+        get_parser().error(i18n('error-simulate-days-oor'))
+    last = None if cmdargs.days is None else slot.today + cmdargs.days
+    planned = [action(day, command, slot.today, last, get_parser())
+               for day, command in cmdargs.on]
+    projection = project(slot, planned, cmdargs.days)
+    pi18n('check-stats-key-today', projection.today)
+    pi18n('check-stats-key-views', projection.views_today)
+    pi18n('check-stats-key-cumulative', projection.views_total)
+    pi18n('check-stats-key-money', projection.money)
+    day = end_day(projection)
+    if day is not None:
+        pi18n('simulate-end', END, day)
+    else:
+        pi18n('simulate-no-end', END, projection.today)
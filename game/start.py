@@ -1,11 +1,15 @@
 import argparse
+from functools import lru_cache
 from .i18n import i18n, pi18n
 
-parser = argparse.ArgumentParser(prog='start', description=i18n('start-desc'))
+@lru_cache(maxsize=None)
+def get_parser() -> argparse.ArgumentParser:
+    return argparse.ArgumentParser(
+        prog='start', description=i18n('start-desc'))
 
 completion = "-W ''"
 no_load_slot = True
 
 def main(args: list[str], slot: None = None):
-    parser.parse_args(args[1:])
+    get_parser().parse_args(args[1:])
     pi18n('start')
\ No newline at end of file
@@ -1,2 +1,5 @@
 # not to be run directly
-python3 game $(basename $0) "$@"
\ No newline at end of file
+if [ -S saves/.daemon ]; then
+	exec python3 -S game/client.py $(basename $0) "$@"
+fi
+python3 game $(basename $0) "$@"
@@ -0,0 +1,18 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse=True)
+def game_dir(tmp_path, monkeypatch):
+    """Run each test in a game directory of its own with no save slots,
+    sharing the strings and grids (and anything built from them)."""
+    for name in os.listdir(ROOT):
+        if name == 'i18n' or name.endswith(('.json', '.bin')):
+            os.symlink(os.path.join(ROOT, name), tmp_path / name)
+    (tmp_path / 'saves').mkdir()
+    (tmp_path / 'saves' / '.lang').write_text('en')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
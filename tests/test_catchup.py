@@ -0,0 +1,158 @@
+import io
+import copy
+import math
+import random
+from contextlib import redirect_stdout
+from decimal import Decimal
+import pytest
+from game import slot as game_slot
+from game.i18n import pi18n
+from game.slot import (
+    MOST_PROFITABLE_AD_PROPORTION, Advertisement, CDNSetup, Channels,
+    Friends, SaveSlot, Transaction)
+
+def per_day_update(self: SaveSlot, now: int):
+    """SaveSlot.update() as it was before catch-ups fast-forwarded quiet
+    days, simulating every day in full, to check the catch-up against.
+
+    The only change is to the warnings at the end: the loop used to
+    crash if a transaction it had warned about cleared later on, so
+    only those still pending are warned about, each position once."""
+    last_touch = self.last_touch
+    self.last_touch = now
+    old_day_number = (last_touch - self.first_touch) // self.day_length
+    day_number = self.today
+    assert len(self.views) == old_day_number
+    warned_trans = []
+    for day in range(old_day_number+1, day_number+1):
+        # expire boosts
+        self.boosts = [boost for boost in self.boosts
+                       if boost.expires is None
+                       or boost.expires > day]
+        # clear transactions
+        transactions_pending: list[Transaction] = []
+        cleared_transactions: list[Transaction] = []
+        money = self.money
+        for transaction in self.transactions_pending:
+            cost = transaction.action.cost(self)
+            if transaction.clear_date > day:
+                transactions_pending.append(transaction)
+            elif cost <= money:
+                cleared_transactions.append(transaction)
+                money -= cost
+            else:
+                if not any(t is transaction for t in warned_trans):
+                    warned_trans.append(transaction)
+                transactions_pending.append(transaction)
+        self.transactions_pending = transactions_pending
+        for transaction in cleared_transactions:
+            transaction.clear(self)
+        # update views
+        view_rate = self.view_rate + sum(
+            boost.boost(self) for boost in self.boosts)
+        if self.views:
+            bonus = math.floor(math.log10(self.views[-1][-1] or 1))
+            self.view_rate += bonus
+            view_rate += bonus
+        ads = self.ad_proportion
+        new_rate = view_rate * (
+            -MOST_PROFITABLE_AD_PROPORTION * ads).exp()
+        self.money += ads * new_rate
+        view_rate = math.ceil(new_rate)
+        if self.views:
+            self.views.append((
+                view_rate, self.views[-1][-1] + view_rate))
+        else:
+            self.views.append((view_rate, view_rate))
+    positions = dict.fromkeys(
+        self.transactions_pending.index(transaction) + 1
+        for transaction in warned_trans
+        if any(t is transaction for t in self.transactions_pending))
+    for position in positions:
+        pi18n('transaction-not-cleared', position)
+
+def random_slot(seed: int) -> SaveSlot:
+    rng = random.Random(seed)
+    history = rng.choice([0, 1, rng.randint(2, 3000)])
+    data = SaveSlot(
+        view_rate=rng.randint(0, 500),
+        money=Decimal(rng.choice([0, rng.randint(0, 5000), 10 ** 9])
+                      * rng.choice([1, 10, 100])),
+        ad_proportion=Decimal(rng.choice(['0', '0', '0.1', '0.25', '0.5'])),
+        difficulty_multiplier=Decimal(rng.choice(['1', '0.5', '2'])),
+        day_length=1200, first_touch=0, last_touch=history * 1200,
+        continued=True) # no prompt when passing END
+    data.views.extend_daily([rng.randint(0, 1000) for _ in range(history)])
+    def boost() -> object:
+        kind = rng.randrange(4)
+        if kind == 0:
+            return Advertisement(history + rng.randint(1, 6000),
+                                 rng.randint(1, 1000))
+        if kind == 1:
+            return Friends(rng.randint(1, 9), history + rng.randint(1, 50))
+        if kind == 2:
+            return CDNSetup(rng.randint(-89, 90), rng.randint(-180, 179))
+        # self-promotion decays too slowly to be quiet for long
+        return Channels(rng.randint(1, 20),
+                        max(history - rng.randint(0, 5), 0))
+    for _ in range(rng.randint(0, 8)):
+        data.boosts.append(boost())
+    for _ in range(rng.randint(0, 30)):
+        transaction = Transaction(history + rng.randint(0, 400), boost())
+        data.transactions_pending.append(transaction)
+        if rng.random() < 0.1: # an equal one, which index() cannot tell apart
+            data.transactions_pending.append(
+                Transaction(transaction.clear_date, transaction.action))
+    return data
+
+def state(data: SaveSlot) -> dict:
+    state = data.serialize(data)
+    state['views'] = list(data.views)
+    state['money'] = str(data.money)
+    return state
+
+@pytest.mark.parametrize('seed', range(40))
+def test_catch_up_matches_per_day_loop(seed):
+    rng = random.Random(-seed)
+    expected = random_slot(seed)
+    actual = copy.deepcopy(expected)
+    now = expected.last_touch
+    for _ in range(3):
+        now += rng.choice([0, 1, rng.randint(2, 2000)]) * 1200
+        printed = io.StringIO()
+        with redirect_stdout(printed):
+            per_day_update(expected, now)
+        warned = printed.getvalue()
+        printed = io.StringIO()
+        with redirect_stdout(printed):
+            actual.update(now)
+        assert printed.getvalue() == warned
+        assert state(actual) == state(expected)
+
+def test_catch_up_matches_per_day_loop_without_numpy(monkeypatch):
+    # long enough to be vectorized if NumPy is installed
+    monkeypatch.setattr(game_slot, '_numpy', lambda: None)
+    expected = SaveSlot(view_rate=7, ad_proportion=Decimal('0.1'),
+                        first_touch=0, last_touch=0, continued=True)
+    expected.boosts.append(Advertisement(150_000, 20))
+    actual = copy.deepcopy(expected)
+    now = 200_000 * expected.day_length
+    per_day_update(expected, now)
+    actual.update(now)
+    assert state(actual) == state(expected)
+
+def test_catch_up_with_boosts_tied_after_dropping_expired_ones():
+    # most of the ads expire on day 10 and are dropped from the boosts;
+    # friends pinged that day expire (the day after the catch-up) with
+    # the same boost as the ad left, and must not be mistaken for it
+    expected = SaveSlot(first_touch=0, last_touch=0, continued=True)
+    expected.boosts.extend(Advertisement(10, 5) for _ in range(5))
+    expected.boosts[1] = Advertisement(21, 5)
+    expected.transactions_pending.extend(
+        Transaction(10, Friends(5)) for _ in range(2))
+    actual = copy.deepcopy(expected)
+    now = 20 * expected.day_length
+    per_day_update(expected, now)
+    actual.update(now)
+    assert state(actual) == state(expected)
+    assert len(actual.boosts) == 3
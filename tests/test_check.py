@@ -0,0 +1,64 @@
+import argparse
+import pickle
+import random
+import pytest
+from game import catch_up, journal, run
+from game.check import ShownDays, view_days, view_rows
+from game.slot import END, SaveSlot
+
+def slot_with(daily: list[int]) -> SaveSlot:
+    data = SaveSlot()
+    data.views.extend_daily(daily)
+    return data
+
+def views_args(start=None, end=None, table=1) -> argparse.Namespace:
+    return argparse.Namespace(start=start, end=end, table=table)
+
+@pytest.mark.parametrize('args', [
+    views_args(), views_args(table=0), views_args(table=7),
+    views_args(start=0), views_args(start=3, end=8), views_args(end=4),
+    views_args(start=8, end=3), views_args(start=50), views_args(end=50),
+])
+@pytest.mark.parametrize('wide', [False, True])
+def test_shown_days_match_the_slot(args, wide):
+    rng = random.Random(len(repr(args)))
+    data = slot_with([rng.randint(0, 10 ** 6) for _ in range(20)])
+    if wide:
+        data.views.extend_daily([2 ** 64])
+    days = view_days(args, data)
+    expected = list(view_rows(days, data.views))
+    # as sent back by the process that caught the slot up
+    shown = pickle.loads(pickle.dumps(ShownDays.of(days, data.views)))
+    assert list(shown.rows()) == expected
+    assert [day for day, _, _ in expected] == list(days)
+
+def test_view_days():
+    data = slot_with([1] * 10)
+    assert view_days(views_args(), data) == range(9, 8, -1)
+    assert list(view_days(views_args(table=3), data)) == [9, 8, 7]
+    assert list(view_days(views_args(table=0), data)) == list(range(9, -1, -1))
+    # a range is listed oldest first, and overrides --table
+    assert list(view_days(views_args(start=7, table=3), data)) == [7, 8, 9]
+    assert list(view_days(views_args(start=2, end=4), data)) == [2, 3, 4]
+    assert list(view_days(views_args(end=1), data)) == [0, 1]
+    assert not view_days(views_args(start=5, end=4), data)
+
+def test_all_slots_skips_slots_past_end(capsys):
+    for name, daily in [('done', [END]), ('going', [5])]:
+        data = slot_with(daily)
+        # one day in, and two more to catch up
+        data.first_touch -= data.day_length * 3
+        data.last_touch -= data.day_length * 2
+        journal.write(name, data)
+    with pytest.raises(SystemExit) as exited:
+        run(['check', 'stats', '-n', 'cumulative', '--all-slots', '-j', '1'])
+    assert not exited.value.code
+    out, err = capsys.readouterr()
+    assert [line.split('\t')[0] for line in out.splitlines()[1:]] == ['going']
+    assert "Skipped save slot 'done'" in err
+    assert 'EOFError' not in err
+    # caught up and saved, but still to be asked about
+    data = journal.read('done')
+    assert len(data.views) == 3
+    assert data.won
+    assert catch_up('done', ask=False).today == 3
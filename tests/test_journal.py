@@ -0,0 +1,62 @@
+import os
+from decimal import Decimal
+import pytest
+from game import import_game, journal, run
+
+SLOT = 'test'
+
+def command(*argv: str):
+    """Run a command on SLOT as if from the command line."""
+    with pytest.raises(SystemExit) as exited:
+        run([*argv, '--save-slot', SLOT])
+    assert not exited.value.code
+
+def files() -> list:
+    """What identifies the current contents of the files of SLOT."""
+    found = []
+    for path in (journal.snapshot_path(SLOT), journal.journal_path(SLOT)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            found.append(None)
+        else:
+            found.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return found
+
+@pytest.fixture(autouse=True)
+def slot():
+    command('change', 'ads', '0.1') # created, then appended to
+    assert all(files())
+
+@pytest.mark.parametrize('argv', [
+    ('check', 'stats'),
+    ('check', 'cdn'),
+    ('check', 'views', '-t', '0'),
+    ('promo', 'friends'),
+    ('change', 'ads'),
+    ('buy', '--quote', 'advertisement'),
+])
+def test_queries_leave_files_alone(argv):
+    before, counted = files(), journal.counters.copy()
+    command(*argv)
+    assert files() == before
+    assert journal.counters['append'] == counted['append']
+    assert journal.counters['compact'] == counted['compact']
+    assert journal.counters['bytes written'] == counted['bytes written']
+    if not hasattr(import_game(argv[0]), 'read_only'):
+        # saved as always, but with nothing to write;
+        # read-only commands do not even try unless catching up
+        assert journal.counters['skip'] == counted['skip'] + 1
+
+def test_changes_are_appended():
+    snapshot, (_, size, _) = files()
+    counted = journal.counters.copy()
+    command('change', 'ads', '0.5')
+    command('promo', 'friends', '1')
+    assert files()[0] == snapshot
+    assert files()[1][1] > size
+    assert journal.counters['append'] == counted['append'] + 2
+    assert journal.counters['compact'] == counted['compact']
+    data = journal.read(SLOT)
+    assert data.ad_proportion == Decimal('0.5')
+    assert data.friends_pinged == 1
@@ -0,0 +1,13 @@
+import argparse
+from decimal import Decimal
+from game import optimize
+from game.slot import SaveSlot
+
+def test_cache_key_changes_with_the_code(monkeypatch):
+    slot = SaveSlot()
+    cmdargs = argparse.Namespace(days=5)
+    options = [optimize.Candidate(Decimal('0.5'), '', [])]
+    key = optimize.cache_key(slot, cmdargs, options)
+    assert optimize.cache_key(slot, cmdargs, options) == key
+    monkeypatch.setattr(optimize, 'code_version', lambda: 'edited')
+    assert optimize.cache_key(slot, cmdargs, options) != key
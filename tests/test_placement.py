@@ -0,0 +1,55 @@
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from typing import Optional
+import pytest
+from game import placement
+from game.slot import CDNSetup, SaveSlot, Transaction
+
+@lru_cache(maxsize=None)
+def every_place(difficulty: Decimal) -> list[tuple[CDNSetup, int, Decimal]]:
+    """Every place on the grids with its boost and exact cost,
+    north-west first."""
+    slot = SaveSlot(difficulty_multiplier=difficulty)
+    places = []
+    for lat in range(90, -90, -1):
+        for long in range(-180, 180):
+            server = CDNSetup(lat, long)
+            places.append((server, server.boost(slot), server.cost(slot)))
+    return places
+
+@lru_cache(maxsize=None)
+def ranked(difficulty: Decimal, by: str, budget: Optional[Decimal]) -> list:
+    """Every affordable place, ranked exactly."""
+    places = [place for place in every_place(difficulty)
+              if budget is None or place[2] <= budget]
+    if by == 'ratio':
+        places.sort(key=lambda place: -place[1] / place[2])
+    else:
+        places.sort(key=lambda place: (-place[1], place[2]))
+    return places
+
+def exhaustive(slot: SaveSlot, count: int, by: str,
+               budget: Optional[Decimal]) -> list:
+    """best(), by ranking every place exactly."""
+    taken = {tuple(coords) for coords in slot.cdn_servers}
+    taken.update(trans.action.coords for trans in slot.transactions_pending)
+    places = (place for place in ranked(slot.difficulty_multiplier, by, budget)
+              if place[0].coords not in taken)
+    return list(islice(places, count))
+
+@pytest.mark.parametrize('difficulty', [
+    '1', '0.3', '0.0625', '7', '100', '0.0001'])
+@pytest.mark.parametrize('by', ['ratio', 'boost'])
+@pytest.mark.parametrize('budget', [None, '100', '250'])
+def test_best_matches_exhaustive_ranking(difficulty, by, budget):
+    slot = SaveSlot(difficulty_multiplier=Decimal(difficulty))
+    budget = None if budget is None else Decimal(budget)
+    for count in (1, 7, 50):
+        expected = exhaustive(slot, count, by, budget)
+        assert placement.best(slot, count, by, budget) == expected
+        # the best places so far are taken, or about to be
+        slot.cdn_servers.append(list(expected[0][0].coords))
+        slot.transactions_pending.append(Transaction(0, expected[-1][0]))
+        assert placement.best(slot, count, by, budget) \
+            == exhaustive(slot, count, by, budget)
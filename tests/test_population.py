@@ -0,0 +1,53 @@
+import json
+from decimal import Decimal
+import pytest
+from game.slot import GRIDS, CDNSetup
+
+@pytest.fixture(scope='module')
+def cells() -> list[list[Decimal]]:
+    with open(GRIDS['POPULATION']) as f:
+        return json.load(f, parse_float=Decimal)
+
+def brute_force(cells: list[list[Decimal]], latitude: int, longitude: int,
+                radius: int) -> Decimal:
+    """population() by adding up every cell around, one by one."""
+    rows, cols = len(cells), len(cells[0])
+    row, col = 90 - latitude, 180 + longitude
+    total = Decimal()
+    for r in range(row - radius, row + radius + 1):
+        if not 0 <= r < rows: # stops at the poles
+            continue
+        # wraps around at the dateline, each cell once
+        columns = {c % cols for c in range(col - radius, col + radius + 1)}
+        for c in columns:
+            total += cells[r][c]
+    return total
+
+# whether population() adds up the cells or uses the summed-area table
+WAYS = pytest.mark.parametrize('direct_cells', [10 ** 6, 0],
+                               ids=['cells', 'table'])
+
+@WAYS
+@pytest.mark.parametrize('radius', [0, 1, 2, 5])
+def test_population_matches_brute_force(cells, radius, direct_cells,
+                                        monkeypatch):
+    monkeypatch.setattr(CDNSetup, 'RADIUS', radius)
+    monkeypatch.setattr(CDNSetup, 'DIRECT_CELLS', direct_cells)
+    for latitude in range(-90, 91):
+        for longitude in range(-180, 181):
+            # down to the exponent, which shows when costs are printed
+            assert str(CDNSetup.population(latitude, longitude)) == str(
+                brute_force(cells, latitude, longitude, radius)), (
+                    latitude, longitude)
+
+@WAYS
+@pytest.mark.parametrize('radius', [90, 179, 180, 400])
+def test_population_matches_brute_force_wider_than_grid(
+        cells, radius, direct_cells, monkeypatch):
+    monkeypatch.setattr(CDNSetup, 'RADIUS', radius)
+    monkeypatch.setattr(CDNSetup, 'DIRECT_CELLS', direct_cells)
+    for latitude, longitude in [(90, -180), (-90, 180), (0, 0), (45, 179),
+                                (-89, -1), (12, 34)]:
+        assert str(CDNSetup.population(latitude, longitude)) == str(
+            brute_force(cells, latitude, longitude, radius)), (
+                latitude, longitude)
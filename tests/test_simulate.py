@@ -0,0 +1,16 @@
+import pytest
+from game import run
+
+def simulate(*argv: str) -> int:
+    with pytest.raises(SystemExit) as exited:
+        run(['simulate', *argv, '--save-slot', 'test'])
+    return exited.value.code
+
+def test_on_up_to_the_last_day(capsys):
+    assert not simulate('3', '--on', '3', 'change ads 0.5')
+    assert 'by day #3' in capsys.readouterr().out
+
+@pytest.mark.parametrize('day', ['-1', '4'])
+def test_on_outside_the_days_simulated(capsys, day):
+    assert simulate('3', '--on', day, 'change ads 0.5') == 2
+    assert 'day #%s' % day in capsys.readouterr().err
@@ -0,0 +1,96 @@
+import copy
+import random
+from decimal import Decimal
+from typing import Optional
+import pytest
+from game import slot as game_slot
+from game.slot import (
+    VECTORIZE_DAYS, Advertisement, SaveSlot, Transaction, _BoostTotals)
+
+pytest.importorskip('numpy')
+
+# how far apart the money of the two may be, as documented
+# by SaveSlot._accrue_vectorized()
+RELATIVE_ERROR = Decimal('1e-20')
+
+def quiet_slot(seed: int) -> SaveSlot:
+    """A slot with nothing happening for longer than VECTORIZE_DAYS,
+    but for a transaction it cannot afford at first, if any."""
+    rng = random.Random(seed)
+    history = rng.randint(1, 50)
+    data = SaveSlot(
+        view_rate=rng.randint(0, 10 ** 4),
+        money=Decimal(rng.randint(0, 10 ** 6)),
+        ad_proportion=Decimal(rng.choice(['0.01', '0.1', '0.25', '0.5', '1'])),
+        first_touch=0, last_touch=history * 1200, continued=True)
+    # near a power of 10, so that the bonus soon changes
+    data.views.extend_daily([rng.randint(0, 10 ** 5)] * history)
+    days = VECTORIZE_DAYS + rng.randint(0, VECTORIZE_DAYS // 2)
+    for _ in range(rng.randint(0, 3)):
+        data.boosts.append(Advertisement(
+            history + days + 1, rng.randint(1, 10 ** 4)))
+    if rng.random() < 0.5:
+        data.transactions_pending.append(Transaction(
+            history, Advertisement(history + days + 10, 10 ** 4)))
+    return data
+
+@pytest.mark.parametrize('seed', range(6))
+def test_vectorized_matches_loop(seed, monkeypatch):
+    vectorized = quiet_slot(seed)
+    looped = copy.deepcopy(vectorized)
+    now = vectorized.first_touch \
+        + (len(vectorized.views) + VECTORIZE_DAYS * 3 // 2) * 1200
+    calls = 0
+    accrue = SaveSlot._accrue_vectorized
+    def counted(self, *args):
+        nonlocal calls
+        calls += 1
+        return accrue(self, *args)
+    monkeypatch.setattr(SaveSlot, '_accrue_vectorized', counted)
+    vectorized.update(now)
+    assert calls
+    monkeypatch.setattr(game_slot, '_numpy', lambda: None)
+    looped.update(now)
+    assert vectorized.views == looped.views
+    assert vectorized.view_rate == looped.view_rate
+    assert vectorized.transactions_pending == looped.transactions_pending
+    assert abs(vectorized.money - looped.money) \
+        <= abs(looped.money) * RELATIVE_ERROR
+
+@pytest.mark.parametrize('seed', range(3))
+def test_vectorized_stops_on_the_loops_day(seed, monkeypatch):
+    data = quiet_slot(seed)
+    data.transactions_pending.clear()
+    days = VECTORIZE_DAYS * 3 // 2
+    def fast_forward(data: SaveSlot, days: int,
+                     threshold: Optional[Decimal]) -> int:
+        return data._fast_forward(days, threshold, _BoostTotals(data))
+    # the loop's money after each of the days that are vectorized
+    monkeypatch.setattr(game_slot, '_numpy', lambda: None)
+    looped = copy.deepcopy(data)
+    money = []
+    for _ in range(days - VECTORIZE_DAYS):
+        fast_forward(looped, 1, None)
+        money.append(looped.money)
+    monkeypatch.undo()
+    calls = 0
+    accrue = SaveSlot._accrue_vectorized
+    def counted(self, *args):
+        nonlocal calls
+        calls += 1
+        return accrue(self, *args)
+    monkeypatch.setattr(SaveSlot, '_accrue_vectorized', counted)
+    rng = random.Random(seed)
+    for _ in range(5):
+        day = rng.randrange(len(money) - 1)
+        # well between two days, the loop and the sum stop on the same one
+        threshold = (money[day] + money[day + 1]) / 2
+        vectorized = copy.deepcopy(data)
+        assert fast_forward(vectorized, days, threshold) == day + 2
+        assert list(vectorized.views) \
+            == list(looped.views)[:len(vectorized.views)]
+        # just the loop's money: a day apart at most, as documented
+        vectorized = copy.deepcopy(data)
+        assert fast_forward(vectorized, days, money[day]) - (day + 1) \
+            in (0, 1)
+    assert calls
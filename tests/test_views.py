@@ -0,0 +1,55 @@
+from game import journal
+from game.slot import SaveSlot, Views
+
+BIG = 2 ** 62
+
+def views_of(daily: list[int]) -> Views:
+    views = Views()
+    views.extend_daily(daily)
+    return views
+
+def test_round_trip():
+    views = views_of([0, 5, 3, 10 ** 12, 7])
+    assert not views.wide
+    assert Views(views.packed) == views
+    assert list(Views(views.packed)) == [
+        (0, 0), (5, 5), (3, 8), (10 ** 12, 10 ** 12 + 8), (7, 10 ** 12 + 15)]
+
+def test_round_trip_at_64_bits():
+    # the largest total that still fits stays in arrays
+    views = views_of([BIG, BIG - 1])
+    assert not views.wide
+    loaded = Views(views.packed)
+    assert not loaded.wide and loaded == views
+
+def test_round_trip_total_past_64_bits():
+    # every day fits in 64 bits, but not the total
+    views = Views()
+    for i in range(3):
+        views.append((BIG, (i + 1) * BIG))
+    assert views.wide
+    loaded = Views(views.packed)
+    assert loaded.wide
+    assert list(loaded) == list(views)
+    assert loaded == views
+
+def test_round_trip_day_past_64_bits():
+    views = views_of([1, 2 ** 64, 3])
+    assert views.wide
+    assert isinstance(views.packed, list)
+    assert Views(views.packed) == views
+
+def test_journal_round_trip_past_64_bits():
+    data = SaveSlot(continued=True)
+    data.views.extend_daily([BIG])
+    journal.write('big', data) # a new snapshot
+    data = journal.read('big')
+    data.views.extend_daily([BIG, BIG]) # appended past 2 ** 63
+    appended = journal.counters['append']
+    journal.write('big', data)
+    assert journal.counters['append'] == appended + 1
+    loaded = journal.read('big')
+    assert loaded.views.wide
+    assert list(loaded.views) == [(BIG, BIG), (BIG, 2 * BIG), (BIG, 3 * BIG)]
+    journal.compact('big', loaded)
+    assert list(journal.read('big').views) == list(loaded.views)
@@ -0,0 +1,120 @@
+"""Regenerate brightness.json from cubic_population.json.
+
+BRIGHTNESS[lat][long] is the sum over every cell of POPULATION divided by
+the squared distance (in grid cells) to that cell, or by 1 for the cell
+itself. That is a 2-D convolution of POPULATION with an inverse-square
+kernel, computed here with FFTs in seconds rather than as an all-pairs
+sum. The defaults reproduce the shipped brightness.json.
+
+Run from the repository root (requires NumPy):
+
+    python3 tools/build_brightness.py [--wrap] [--power P] [--radius R]
+    python3 tools/build_brightness.py --verify 200
+"""
+import sys
+import json
+import argparse
+from time import perf_counter
+
+try:
+    import numpy
+except ImportError:
+    sys.exit('build_brightness.py requires NumPy: '
+             '`python3 -m pip install -U numpy`')
+
+def kernel(rows: int, cols: int, args: argparse.Namespace) -> numpy.ndarray:
+    """The kernel, indexed by (row offset, column offset) modulo its shape.
+
+    Without --wrap it has 2 * rows - 1 by 2 * cols - 1 cells, so that
+    the convolution does not wrap around; with it, columns are taken
+    modulo the width of the map instead.
+    """
+    drow = numpy.arange(2 * rows - 1)
+    drow = numpy.minimum(drow, 2 * rows - 1 - drow)
+    if args.wrap:
+        dcol = numpy.arange(cols)
+        dcol = numpy.minimum(dcol, cols - dcol)
+    else:
+        dcol = numpy.arange(2 * cols - 1)
+        dcol = numpy.minimum(dcol, 2 * cols - 1 - dcol)
+    squared = (drow[:, None] ** 2 + dcol[None, :] ** 2).astype(float)
+    with numpy.errstate(divide='ignore'):
+        weights = squared ** -args.power
+    weights[0, 0] = 1 / args.center
+    if args.radius is not None:
+        weights[squared > args.radius ** 2] = 0
+    return weights
+
+def convolve(population: numpy.ndarray, args: argparse.Namespace
+             ) -> numpy.ndarray:
+    rows, cols = population.shape
+    weights = kernel(rows, cols, args)
+    spectrum = numpy.fft.rfft2(population, weights.shape) \
+        * numpy.fft.rfft2(weights)
+    return numpy.fft.irfft2(spectrum, weights.shape)[:rows, :cols]
+
+def brute_force(population: numpy.ndarray, row: int, col: int,
+                args: argparse.Namespace) -> float:
+    """One cell of the map, summed directly from its definition."""
+    rows, cols = population.shape
+    drow = numpy.arange(rows)[:, None] - row
+    dcol = numpy.abs(numpy.arange(cols)[None, :] - col)
+    if args.wrap:
+        dcol = numpy.minimum(dcol, cols - dcol)
+    squared = (drow ** 2 + dcol ** 2).astype(float)
+    with numpy.errstate(divide='ignore'):
+        weights = squared ** -args.power
+    weights[row, col] = 1 / args.center
+    if args.radius is not None:
+        weights[squared > args.radius ** 2] = 0
+    return float((population * weights).sum())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--population', default='cubic_population.json',
+                        help='grid to convolve (default: %(default)s)')
+    parser.add_argument('--output', default='brightness.json',
+                        help='where to write the map (default: %(default)s)')
+    parser.add_argument('--power', type=float, default=1,
+                        help='divide by squared distance to this power '
+                        '(default: %(default)s, i.e. inverse-square)')
+    parser.add_argument('--center', type=float, default=1,
+                        help='divisor for a cell\'s own population '
+                        '(default: %(default)s)')
+    parser.add_argument('--radius', type=float, default=None,
+                        help='ignore cells further than this many cells '
+                        'away (default: no limit)')
+    parser.add_argument('--wrap', action='store_true',
+                        help='measure distance around the dateline')
+    parser.add_argument('--verify', type=int, metavar='N', default=None,
+                        help='instead of writing the map, compare N random '
+                        'cells against a brute-force sum')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for --verify')
+    args = parser.parse_args()
+
+    with open(args.population) as f:
+        population = numpy.array(json.load(f), dtype=float)
+    start = perf_counter()
+    brightness = convolve(population, args)
+    print('convolved %dx%d grid in %.2fs' % (
+        *population.shape, perf_counter() - start), file=sys.stderr)
+
+    if args.verify is not None:
+        rng = numpy.random.default_rng(args.seed)
+        worst = 0.0
+        for _ in range(args.verify):
+            row = int(rng.integers(population.shape[0]))
+            col = int(rng.integers(population.shape[1]))
+            expected = brute_force(population, row, col, args)
+            error = abs(brightness[row, col] - expected) / (abs(expected) or 1)
+            worst = max(worst, error)
+        print('worst relative error over %d cells: %.3g'
+              % (args.verify, worst))
+        sys.exit(1 if worst > 1e-9 else 0)
+
+    with open(args.output, 'w') as f:
+        json.dump(brightness.tolist(), f)
+
+if __name__ == '__main__':
+    main()